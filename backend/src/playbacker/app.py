@@ -1,50 +1,106 @@
 import asyncio
+import math
 import subprocess
+from collections.abc import Callable
 from pathlib import Path
-from typing import Any
+from typing import Any, TypeVar
 
 import watchfiles
-import yaml
 from pydantic import BaseModel
 from starlite import (
     Controller,
     CORSConfig,
+    DefineMiddleware,
     Dependency,
+    HttpMethod,
+    MediaType,
     NotFoundException,
     Provide,
+    Request,
+    Response,
     Starlite,
     StaticFilesConfig,
     WebSocket,
+    get,
     post,
+    route,
     websocket,
 )
-
-from playbacker.config import (
-    Config,
-    get_config_file_path,
-    get_setlists_dir_path,
-    get_songs_file_path,
+from starlite.exceptions import WebSocketDisconnect
+from starlite.status_codes import (
+    HTTP_304_NOT_MODIFIED,
+    HTTP_503_SERVICE_UNAVAILABLE,
+    WS_1013_TRY_AGAIN_LATER,
 )
+from starlite.types import Method
+
+from playbacker.broadcast import Broadcaster, Changes, SubscriptionDropped
+from playbacker.config import Config, read_yaml
+from playbacker.core.histogram import Histogram
 from playbacker.core.playback import Playback
-from playbacker.core.player import Player
+from playbacker.core.player import AsyncPlayer, Player
 from playbacker.core.setlist import (
     NoSongInStorageError,
     Setlist,
+    SetlistIndex,
     load_setlist,
-    prettify_setlist_stem,
 )
-from playbacker.core.settings import load_settings
-from playbacker.core.song import load_songs
+from playbacker.core.settings import load_settings, preload_sounds
+from playbacker.core.song import Song, SongIndex
 from playbacker.core.tempo import Tempo
+from playbacker.feed import SetlistFeed, SetlistsMessage
+from playbacker.metrics import RequestTimingMiddleware, ServerMetrics, render_metrics
+from playbacker.snapshot import get_snapshot
+
+T = TypeVar("T")
+
+# Group bursts of changes, editors often write files in several steps
+WATCH_DEBOUNCE_MS = 500
 
 
-def get_setlist_path_from_pretty_name(name: str, setlists_dir_path: Path) -> Path:
-    map = {prettify_setlist_stem(f.stem): f for f in setlists_dir_path.glob("*.yaml")}
-    if path := map.get(name):
+def get_setlist_path_from_pretty_name(name: str, setlist_index: SetlistIndex) -> Path:
+    if path := setlist_index.get_path(name):
         return path
     raise NotFoundException(detail="no setlist with this name")
 
 
+def get_song_by_name(name: str, song_index: SongIndex) -> Song:
+    if song := song_index.get(name):
+        return song
+    raise NotFoundException(detail="no song with this name")
+
+
+def resolve_setlist(name: str, content: Any, song_index: SongIndex) -> Setlist:
+    try:
+        return load_setlist(name=name, content=content, songs=song_index.songs)
+    except NoSongInStorageError as err:
+        raise NotFoundException(detail=err.message)
+
+
+# Setlists are read with GET so browser cache can revalidate them,
+# POST is kept for older clients
+READ_METHODS: list[Method | HttpMethod] = [HttpMethod.GET, HttpMethod.POST]
+
+
+def is_not_modified(request: Request[Any, Any], etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in tags or etag in tags
+
+
+def conditional_response(
+    request: Request[Any, Any], etag: str, get_content: Callable[[], T]
+) -> Response[T | None]:
+    """Respond with 304 without building content if client has same version."""
+    # Browser has to revalidate cached response every time
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if is_not_modified(request, etag):
+        return Response(None, status_code=HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(get_content(), headers=headers)
+
+
 class PlayerState(BaseModel):
     playing: bool
     guide_enabled: bool
@@ -54,93 +110,244 @@ class PlayerState(BaseModel):
         return cls(playing=player.playing, guide_enabled=player.guide_enabled)
 
 
-class MainController(Controller):
-    @post("/get_setlists")
-    def get_setlists(self, setlists_dir: Path) -> list[str]:
-        stems = [prettify_setlist_stem(f.stem) for f in setlists_dir.glob("*.yaml")]
-        stems.sort(reverse=True)
-        return stems
+class HistogramState(BaseModel):
+    count: int
+    mean: float
+    max: float
+    # Upper bound of bucket and number of values in it
+    buckets: dict[str, int]
 
-    @post("/get_setlist")
-    def get_setlist(self, name: str, setlists_dir: Path, songs_file: Path) -> Setlist:
-        path = get_setlist_path_from_pretty_name(name, setlists_dir)
+    @classmethod
+    def make(cls, histogram: Histogram):
+        return cls(
+            count=histogram.count,
+            mean=histogram.mean,
+            max=histogram.max if histogram.count else 0,
+            buckets={
+                "+Inf" if math.isinf(bound) else str(bound): count
+                for bound, count in histogram.buckets()
+            },
+        )
 
-        with songs_file.open() as f:
-            songs = load_songs(content=yaml.safe_load(f))
 
-        with path.open() as f:
-            content = yaml.safe_load(f)
+class StatsState(BaseModel):
+    device: str | None
+    sample_rate: int
+    callback_duration: HistogramState
+    callback_load: HistogramState
+    output_underflows: int
+    priming_outputs: int
 
-        try:
-            return load_setlist(name=name, content=content, songs=songs)
-        except NoSongInStorageError as err:
-            raise NotFoundException(detail=err.message)
+    @classmethod
+    def make(cls, player: Player):
+        mixer = player.playback.mixer
+        stats = mixer.stats
+        return cls(
+            device=mixer.device_name,
+            sample_rate=mixer.sample_rate,
+            callback_duration=HistogramState.make(stats.duration),
+            callback_load=HistogramState.make(stats.load),
+            output_underflows=stats.output_underflows,
+            priming_outputs=stats.priming_outputs,
+        )
+
+
+def handle_player_timeout(
+    _: Request[Any, Any], __: TimeoutError
+) -> Response[dict[str, Any]]:
+    return Response(
+        content={
+            "status_code": HTTP_503_SERVICE_UNAVAILABLE,
+            "detail": "player didn't respond in time",
+        },
+        status_code=HTTP_503_SERVICE_UNAVAILABLE,
+    )
+
+
+class MainController(Controller):
+    @route("/get_setlists", http_method=READ_METHODS)
+    def get_setlists(
+        self,
+        request: Request[Any, Any],
+        setlist_index: SetlistIndex = Dependency(skip_validation=True),
+    ) -> Response[list[str] | None]:
+        etag = f'"{setlist_index.names_tag}"'
+        return conditional_response(request, etag, lambda: setlist_index.names)
+
+    @route("/get_setlist", http_method=READ_METHODS)
+    def get_setlist(
+        self,
+        request: Request[Any, Any],
+        name: str,
+        setlist_index: SetlistIndex = Dependency(skip_validation=True),
+        song_index: SongIndex = Dependency(skip_validation=True),
+    ) -> Response[Setlist | None]:
+        # Index may be updated meanwhile, use one version of entry
+        if not (entry := setlist_index.get(name)):
+            raise NotFoundException(detail="no setlist with this name")
+
+        if entry.tag is None:
+            # File failed to parse on last change, raise the error again
+            content = read_yaml(entry.path)
+            return Response(resolve_setlist(name, content, song_index))
+
+        # Both files are tagged by mtime and size, nothing is parsed or
+        # serialized if client has this version
+        etag = f'"{entry.tag}.{song_index.tag}"'
+        return conditional_response(
+            request, etag, lambda: resolve_setlist(name, entry.content, song_index)
+        )
 
     @post("/toggle_playing")
-    def toggle_playing(
-        self, data: Tempo, player: Player = Dependency(skip_validation=True)
+    async def toggle_playing(
+        self,
+        data: Tempo,
+        song: str | None = None,
+        player: AsyncPlayer = Dependency(skip_validation=True),
+        song_index: SongIndex = Dependency(skip_validation=True),
     ) -> PlayerState:
-        if player.playing:
-            player.pause()
-        else:
-            player.play(data)
-        return PlayerState.make(player)
+        found = get_song_by_name(song, song_index) if song else None
+        await player.toggle_playing(data, song=found)
+        return PlayerState.make(player.player)
 
     @post("/toggle_guide_enabled")
-    def toggle_guide_enabled(
-        self, player: Player = Dependency(skip_validation=True)
+    async def toggle_guide_enabled(
+        self, player: AsyncPlayer = Dependency(skip_validation=True)
     ) -> PlayerState:
-        player.guide_enabled = not player.guide_enabled
-        return PlayerState.make(player)
+        await player.toggle_guide_enabled()
+        return PlayerState.make(player.player)
 
     @post("/prepare_for_switch")
-    def prepare_for_switch(
-        self, player: Player = Dependency(skip_validation=True)
+    async def prepare_for_switch(
+        self, player: AsyncPlayer = Dependency(skip_validation=True)
     ) -> PlayerState:
-        player.prepare_for_switch()
-        return PlayerState.make(player)
+        await player.prepare_for_switch()
+        return PlayerState.make(player.player)
+
+    @get("/stats")
+    def stats(
+        self, player: AsyncPlayer = Dependency(skip_validation=True)
+    ) -> StatsState:
+        return StatsState.make(player.player)
+
+    @get("/metrics", media_type=MediaType.TEXT)
+    def metrics(
+        self,
+        player: AsyncPlayer = Dependency(skip_validation=True),
+        server_metrics: ServerMetrics = Dependency(skip_validation=True),
+    ) -> str:
+        return render_metrics(player.player, server_metrics)
 
     @post("/reset")
-    def reset(self, player: Player = Dependency(skip_validation=True)) -> PlayerState:
-        player.reset()
-        return PlayerState.make(player)
+    async def reset(
+        self, player: AsyncPlayer = Dependency(skip_validation=True)
+    ) -> PlayerState:
+        await player.reset()
+        return PlayerState.make(player.player)
 
 
 @websocket("/watch")
 async def watch_route(
     socket: WebSocket[Any, Any],
     current_setlist: str,
-    setlists_dir: Path,
-    songs_file: Path,
+    version: int | None = None,
+    setlist_index: SetlistIndex = Dependency(skip_validation=True),
+    feed: SetlistFeed = Dependency(skip_validation=True),
+    broadcaster: Broadcaster = Dependency(skip_validation=True),
+    server_metrics: ServerMetrics = Dependency(skip_validation=True),
 ) -> None:
+    """Push current setlist as snapshot, then as patches on every change.
+
+    Client sends last version it has with `version` query parameter when
+    reconnecting, or "resync" message to get full snapshot.
+    """
     await socket.accept()
-    setlist_path = get_setlist_path_from_pretty_name(current_setlist, setlists_dir)
+    setlist_path = get_setlist_path_from_pretty_name(current_setlist, setlist_index)
+    subscription = broadcaster.subscribe()
+    sent_version = version
+
+    async def send_setlist():
+        nonlocal sent_version
+        messages = feed.messages_since(current_setlist, sent_version)
+        sent_version = feed.get(current_setlist).version
+        for message in messages:
+            await socket.send_text(message.json())
 
     async def run():
-        async for changes in watchfiles.awatch(  # pyright: ignore[reportUnknownMemberType]
-            songs_file, setlists_dir
-        ):
-            for _, path in changes:
-                path = Path(path)
-                if path == setlist_path or path == songs_file:
-                    await socket.send_text("current_setlist")
-                else:
-                    await socket.send_text("setlists")
+        try:
+            await send_setlist()
+            while True:
+                changes = await subscription.get()
+                await send_setlist()
+                if changes - {setlist_path, feed.song_index.path}:
+                    await socket.send_text(SetlistsMessage(type="setlists").json())
+        except SubscriptionDropped:
+            server_metrics.dropped_watchers += 1
+            await socket.close(code=WS_1013_TRY_AGAIN_LATER)
 
     task = asyncio.create_task(run())
     try:
-        await socket.receive()
+        server_metrics.watchers += 1
+        while True:
+            if await socket.receive_text() == "resync":
+                sent_version = None
+                await send_setlist()
+    except WebSocketDisconnect:
+        pass
     finally:
         task.cancel()
+        broadcaster.unsubscribe(subscription)
+        server_metrics.watchers -= 1
 
 
-def get_app(config: Config):
-    setlists_dir = get_setlists_dir_path(config.config_dir_path)
-    songs_file = get_songs_file_path(config.config_dir_path)
+def apply_changes(
+    changes: set[tuple[watchfiles.Change, str]],
+    song_index: SongIndex,
+    setlist_index: SetlistIndex,
+) -> Changes:
+    paths = frozenset(Path(path) for _, path in changes)
+    for path in paths:
+        setlist_index.update(path)
+
+    if song_index.path in paths:
+        try:
+            song_index.refresh()
+        except Exception as err:
+            # Keep serving previous songs until file is fixed
+            print(f"Failed to reload {song_index.path}: {err}")
+
+    return paths
+
+
+async def watch_files(feed: SetlistFeed, broadcaster: Broadcaster) -> None:
+    """Single watcher for whole app: update indexes and setlist versions, then
+    notify subscribers.
+    """
+    song_index, setlist_index = feed.song_index, feed.setlist_index
+    async for changes in watchfiles.awatch(  # pyright: ignore[reportUnknownMemberType]
+        song_index.path, setlist_index.directory, debounce=WATCH_DEBOUNCE_MS
+    ):
+        paths = await asyncio.to_thread(
+            apply_changes, changes, song_index, setlist_index
+        )
+        feed.update(paths)
+        broadcaster.publish(paths)
+
 
-    with get_config_file_path(config.config_dir_path).open() as f:
-        content = yaml.safe_load(f)
-    player = Player(Playback(load_settings(content=content, device_name=config.device)))
+def get_app(config: Config):
+    snapshot = get_snapshot(config)
+    # Query device on every start, it may be another one under the same name
+    settings = load_settings(snapshot.config, config.device)
+    song_index, setlist_index = snapshot.song_index, snapshot.setlist_index
+    for file, elapsed in preload_sounds(settings):
+        print(f"Loaded {file.path} in {elapsed * 1000:.1f} ms")
+    player = AsyncPlayer(Player(Playback(settings)))
+    # Settings, sounds and playback objects live until shutdown
+    player.player.memory.freeze()
+    player.player.memory.install()
+    server_metrics = ServerMetrics()
+    broadcaster = Broadcaster()
+    feed = SetlistFeed(song_index, setlist_index)
 
     frontend = Path(__file__).parent / "dist"
     with_frontend = frontend.exists()
@@ -155,15 +362,34 @@ def get_app(config: Config):
         if with_frontend:
             subprocess.check_call(("open", "http://127.0.0.1:8000"))
 
+    tasks: list[asyncio.Task[None]] = []
+
+    # Sync lifespan handlers run in thread, these need event loop
+    async def start_watching_files():
+        tasks.append(asyncio.create_task(watch_files(feed, broadcaster)))
+
+    async def stop_watching_files():
+        for task in tasks:
+            task.cancel()
+
     return Starlite(
         route_handlers=[MainController, watch_route],
         dependencies={
-            "setlists_dir": Provide(lambda: setlists_dir),
-            "songs_file": Provide(lambda: songs_file),
+            "song_index": Provide(lambda: song_index),
+            "setlist_index": Provide(lambda: setlist_index),
             "player": Provide(lambda: player),
+            "server_metrics": Provide(lambda: server_metrics),
+            "broadcaster": Provide(lambda: broadcaster),
+            "feed": Provide(lambda: feed),
         },
-        on_startup=[open_browser],
-        on_shutdown=[player.stop],
+        middleware=[DefineMiddleware(RequestTimingMiddleware, metrics=server_metrics)],
+        on_startup=[open_browser, start_watching_files],
+        on_shutdown=[
+            stop_watching_files,
+            player.stop,
+            player.player.memory.uninstall,
+        ],
+        exception_handlers={TimeoutError: handle_player_timeout},
         cors_config=CORSConfig(),
         static_files_config=static_files_config,
     )
@@ -0,0 +1,51 @@
+import asyncio
+from dataclasses import dataclass, field
+from pathlib import Path
+
+# Paths that changed in one debounced batch
+Changes = frozenset[Path]
+
+
+class SubscriptionDropped(Exception):
+    pass
+
+
+@dataclass(eq=False)
+class Subscription:
+    queue: asyncio.Queue[Changes]
+    dropped: bool = False
+
+    async def get(self) -> Changes:
+        if self.dropped:
+            raise SubscriptionDropped
+        return await self.queue.get()
+
+
+@dataclass
+class Broadcaster:
+    """Fan out file changes from single watcher to every subscriber.
+
+    Each subscriber has bounded queue. Subscribers that fall behind are dropped
+    instead of making watcher wait or buffer indefinitely.
+    """
+
+    max_queue_size: int = 16
+    subscriptions: set[Subscription] = field(
+        default_factory=set[Subscription], init=False
+    )
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(asyncio.Queue(self.max_queue_size))
+        self.subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self.subscriptions.discard(subscription)
+
+    def publish(self, changes: Changes) -> None:
+        for subscription in tuple(self.subscriptions):
+            try:
+                subscription.queue.put_nowait(changes)
+            except asyncio.QueueFull:
+                subscription.dropped = True
+                self.unsubscribe(subscription)
@@ -1,7 +1,22 @@
+from collections.abc import Callable, Hashable
 from pathlib import Path
+from time import perf_counter
+from typing import Any, TypeVar, TypeVarTuple
 
+import yaml
 from pydantic import BaseModel
 
+from playbacker.core.filetag import get_file_tag
+from playbacker.core.histogram import Histogram
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader
+
+T = TypeVar("T")
+Ts = TypeVarTuple("Ts")
+
 
 class Config(BaseModel):
     config_dir_path: Path
@@ -24,3 +39,50 @@ def get_setlists_dir_path(config_dir_path: Path):
     path = config_dir_path / "setlists"
     assert path.exists()
     return path
+
+
+def get_parse_duration_histogram() -> Histogram:
+    """Time spent parsing YAML files in seconds."""
+    return Histogram(bounds=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1))
+
+
+parse_durations = get_parse_duration_histogram()
+# Path, converter and its arguments to file tag and converted content
+_memo: dict[tuple[Path, Hashable, tuple[Any, ...]], tuple[str, Any]] = {}
+
+
+def _identity(content: Any) -> Any:
+    return content
+
+
+def _parse_yaml(path: Path) -> Any:
+    started = perf_counter()
+    with path.open() as f:
+        content = yaml.load(f, Loader=SafeLoader)
+    parse_durations.record(perf_counter() - started)
+    return content
+
+
+def load_yaml(path: Path, convert: Callable[[Any, *Ts], T], *args: *Ts) -> T:
+    """Parse YAML file and pass content to `convert` along with `args`.
+
+    Result is memoized by path, mtime and size, so file is parsed and validated
+    again only after it changes. Result is shared, don't modify it.
+    """
+    key = (path, convert, tuple(args))
+    tag = get_file_tag(path)
+    if (entry := _memo.get(key)) and entry[0] == tag:
+        return entry[1]
+
+    if convert is _identity:
+        content = _parse_yaml(path)
+    else:
+        content = read_yaml(path)
+    result = convert(content, *args)
+    _memo[key] = (tag, result)
+    return result
+
+
+def read_yaml(path: Path) -> Any:
+    """Parsed content of YAML file, memoized like in `load_yaml()`."""
+    return load_yaml(path, _identity)
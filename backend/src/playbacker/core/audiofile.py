@@ -1,23 +1,133 @@
+import contextlib
+import hashlib
+import os
+import tempfile
+import time
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from functools import cached_property
 from pathlib import Path
 from typing import Any, cast
 
 import numpy
-import soundfile
-import soxr
 
 AudioArray = numpy.ndarray[Any, numpy.dtype[Any]]
 
 
+def get_default_cache_dir() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or Path("~/.cache").expanduser()
+    return Path(base) / "playbacker"
+
+
+@dataclass
+class AudioCache:
+    """On-disk cache of decoded and resampled audio.
+
+    Entries are `.npy` files keyed by source path, mtime, size and target sample
+    rate, so they are memory-mapped instead of decoded. Least recently used entries
+    are evicted when total size exceeds the limit.
+    """
+
+    directory: Path
+    max_size: int
+    hits: int = field(default=0, init=False)
+    misses: int = field(default=0, init=False)
+
+    def get_entry_path(self, path: Path, sample_rate: int) -> Path:
+        stat = path.stat()
+        key = f"{path.resolve()}:{stat.st_mtime_ns}:{stat.st_size}:{sample_rate}"
+        return self.directory / f"{hashlib.sha1(key.encode()).hexdigest()}.npy"
+
+    def load(self, path: Path, sample_rate: int) -> AudioArray | None:
+        entry = self.get_entry_path(path, sample_rate)
+        try:
+            data = numpy.load(entry, mmap_mode="r")
+        except (FileNotFoundError, ValueError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        os.utime(entry)  # Mark as recently used
+        # Plain array is cheaper to slice in audio callbacks than numpy.memmap
+        return numpy.asarray(data)
+
+    def store(self, path: Path, sample_rate: int, data: AudioArray) -> None:
+        """Save entry. Cache is optional: errors are reported, not raised."""
+        try:
+            entry = self.get_entry_path(path, sample_rate)
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+            # Write to temporary file first so that readers never see partial entry
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    numpy.save(f, data)
+                os.replace(tmp, entry)
+            finally:
+                Path(tmp).unlink(missing_ok=True)
+
+            self.evict()
+        except OSError as err:
+            print(f"Failed to cache {path}: {err}")
+
+    def get_entries(self) -> list[Path]:
+        return list(self.directory.glob("*.npy")) if self.directory.exists() else []
+
+    def evict(self) -> None:
+        # Other threads may replace or evict entries meanwhile
+        entries: list[tuple[Path, os.stat_result]] = []
+        for path in self.get_entries():
+            with contextlib.suppress(FileNotFoundError):
+                entries.append((path, path.stat()))
+        entries.sort(key=lambda e: e[1].st_mtime)
+        total = sum(stat.st_size for _, stat in entries)
+
+        for path, stat in entries:
+            if total <= self.max_size:
+                break
+            with contextlib.suppress(FileNotFoundError):
+                path.unlink()
+            total -= stat.st_size
+
+    def clear(self) -> None:
+        for path in self.get_entries():
+            path.unlink(missing_ok=True)
+
+
 @dataclass
 class AudioFile:
     path: Path
     sample_rate: int = field(repr=False)
+    cache: AudioCache | None = field(default=None, repr=False, compare=False)
 
     @cached_property
     def data(self) -> AudioArray:
-        """Read audio file and convert to required sample rate."""
+        """Read audio file and convert to required sample rate, use cache if set."""
+        if self.cache:
+            if (data := self.cache.load(self.path, self.sample_rate)) is not None:
+                return data
+
+        data = self._decode()
+        if self.cache:
+            self.cache.store(self.path, self.sample_rate, data)
+        return data
+
+    @property
+    def loaded(self) -> bool:
+        return "data" in self.__dict__
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Decoded audio is never pickled, it is loaded again from cache
+        state = self.__dict__.copy()
+        state.pop("data", None)
+        return state
+
+    def _decode(self) -> AudioArray:
+        # Only needed on cache miss, keep them out of startup
+        import soundfile
+        import soxr
+
         data, in_rate = cast(
             tuple[AudioArray, int],
             soundfile.read(self.path),  # pyright: ignore[reportUnknownMemberType]
@@ -32,3 +142,19 @@ class AudioFile:
                 data, in_rate, self.sample_rate
             ),
         )
+
+
+def _load_audiofile(file: AudioFile) -> float:
+    start = time.perf_counter()
+    file.data
+    return time.perf_counter() - start
+
+
+def preload_audiofiles(files: Iterable[AudioFile]) -> list[tuple[AudioFile, float]]:
+    """Decode and resample files concurrently, return seconds spent on each one.
+
+    libsndfile and soxr release the GIL, so threads are enough.
+    """
+    files = list(files)
+    with ThreadPoolExecutor() as executor:
+        return list(zip(files, executor.map(_load_audiofile, files)))
@@ -1,17 +1,138 @@
+import ctypes
+import ctypes.util
+import errno
+import math
+import sys
 import time
 from collections.abc import Callable
 from dataclasses import dataclass, field
 from threading import Event, Thread
-from typing import NoReturn
+from typing import Literal, NoReturn, Protocol
+
+from playbacker.core.histogram import Histogram
+
+
+class Scheduler(Protocol):
+    def wait_until(self, deadline: float) -> None:
+        """Block until `time.monotonic()` reaches deadline."""
+
+
+class SleepScheduler:
+    """Sleep for most of remaining time, wake up a bit early."""
+
+    def wait_until(self, deadline: float) -> None:
+        result = deadline - time.monotonic()
+        sleep_for = result * 0.925 if result > 0 else 0
+        time.sleep(sleep_for)
+
+
+@dataclass
+class HybridScheduler:
+    """Sleep until shortly before deadline, then spin until it."""
+
+    spin_for: float = 0.002
+
+    def wait_until(self, deadline: float) -> None:
+        if (result := deadline - self.spin_for - time.monotonic()) > 0:
+            time.sleep(result)
+
+        while time.monotonic() < deadline:
+            time.sleep(0)  # Release GIL for audio callbacks while spinning
+
+
+class _Timespec(ctypes.Structure):
+    _fields_ = [("tv_sec", ctypes.c_long), ("tv_nsec", ctypes.c_long)]
+
+
+CLOCK_MONOTONIC = 1
+TIMER_ABSTIME = 1
+
+
+class DeadlineScheduler:
+    """Sleep until absolute deadline with clock_nanosleep(2), Linux only.
+
+    Deadline doesn't depend on when the thread got to sleep, so late wakeups don't
+    accumulate.
+    """
+
+    def __init__(self) -> None:
+        if not sys.platform.startswith("linux"):
+            raise RuntimeError("Deadline scheduler is only supported on Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._clock_nanosleep = libc.clock_nanosleep
+
+    def wait_until(self, deadline: float) -> None:
+        sec, fraction = divmod(deadline, 1)
+        request = _Timespec(int(sec), int(fraction * 1e9))
+
+        while (
+            result := self._clock_nanosleep(
+                CLOCK_MONOTONIC, TIMER_ABSTIME, ctypes.byref(request), None
+            )
+        ) == errno.EINTR:
+            pass
+
+        if result != 0:
+            raise OSError(result, "clock_nanosleep failed")
+
+
+SchedulerName = Literal["sleep", "hybrid", "deadline"]
+schedulers: dict[SchedulerName, Callable[[], Scheduler]] = {
+    "sleep": SleepScheduler,
+    "hybrid": HybridScheduler,
+    "deadline": DeadlineScheduler,
+}
+
+
+def get_lateness_histogram() -> Histogram:
+    """Tick lateness in seconds, negative values mean tick was early."""
+    return Histogram(
+        bounds=(
+            -0.005,
+            -0.001,
+            -0.0001,
+            0,
+            0.00005,
+            0.0001,
+            0.00025,
+            0.0005,
+            0.001,
+            0.002,
+            0.005,
+            0.01,
+        )
+    )
 
 
 @dataclass
-class Clock:
+class BaseClock(Protocol):
     callback: Callable[[], None] = field(repr=False)
+    # Time between ticks in seconds
+    lag: float = field(init=False)
+
+    def start(self) -> None:  # pragma: no cover
+        ...
+
+    def pause(self) -> None:  # pragma: no cover
+        ...
+
+    def destroy(self) -> None:  # pragma: no cover
+        ...
+
+
+@dataclass
+class Clock(BaseClock):
+    """Ticks from separate thread, waiting for next tick with scheduler."""
+
+    scheduler: Scheduler = field(default_factory=SleepScheduler, repr=False)
+    # Called from clock thread before it starts ticking
+    prepare_thread: Callable[[], None] | None = field(default=None, repr=False)
     thread: Thread = field(init=False, repr=False)
     started: Event = field(default_factory=Event, init=False, repr=False)
-    lag: float = field(init=False)
     previous_time: float = field(init=False, repr=False)
+    lateness: Histogram = field(
+        default_factory=get_lateness_histogram, init=False, repr=False
+    )
 
     def __post_init__(self) -> None:
         self.thread = Thread(daemon=True, target=self.run)
@@ -28,13 +149,12 @@ class Clock:
         self.thread.join(0)
 
     def _sleep(self):
-        result = self.lag + self.previous_time - time.monotonic()
-        sleep_for = result * 0.925 if result > 0 else 0
-        time.sleep(sleep_for)
+        self.scheduler.wait_until(self.previous_time + self.lag)
 
     def _tick(self) -> None:
         self._sleep()
         self.previous_time += self.lag
+        self.lateness.record(time.monotonic() - self.previous_time)
         self.callback()
 
     def _run_once(self) -> None:
@@ -43,5 +163,51 @@ class Clock:
             self._tick()
 
     def run(self) -> NoReturn:
+        if self.prepare_thread:
+            self.prepare_thread()
+
         while True:
             self._run_once()
+
+
+@dataclass
+class FrameClock(BaseClock):
+    """Ticks on exact frames consumed by audio callback, doesn't have own thread.
+
+    Audio callback should render in chunks returned by `advance()`, so every tick
+    happens at precise sample offset inside the block.
+    """
+
+    sample_rate: int = field(repr=False)
+    started: bool = field(default=False, init=False)
+    # Frames consumed since start
+    frame: int = field(default=0, init=False, repr=False)
+    # Not rounded to keep ticks from drifting when lag isn't whole number of frames
+    next_tick_frame: float = field(default=0, init=False, repr=False)
+
+    def start(self) -> None:
+        self.frame = 0
+        self.next_tick_frame = self.lag * self.sample_rate
+        self.started = True
+
+    def pause(self) -> None:
+        self.started = False
+
+    def destroy(self) -> None:
+        self.pause()
+
+    def advance(self, frames: int) -> int:
+        """Tick if it's time to and consume frames until next tick.
+
+        Returns number of consumed frames, not more than requested.
+        """
+        if not self.started:
+            return frames
+
+        while self.frame >= self.next_tick_frame:
+            self.callback()
+            self.next_tick_frame += self.lag * self.sample_rate
+
+        size = min(frames, math.ceil(self.next_tick_frame) - self.frame)
+        self.frame += size
+        return size
@@ -0,0 +1,18 @@
+import hashlib
+from collections.abc import Iterable
+from pathlib import Path
+
+
+def get_file_tag(path: Path) -> str:
+    """Identity of file version, changes when file is written."""
+    stat = path.stat()
+    return f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+
+
+def combine_tags(tags: Iterable[str]) -> str:
+    return hashlib.blake2b("\n".join(tags).encode(), digest_size=8).hexdigest()
+
+
+def get_content_tag(data: bytes) -> str:
+    """Identity of file content, same for equal content wherever it's stored."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
@@ -0,0 +1,127 @@
+import os
+import re
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, cast
+
+import yaml
+from pydantic import BaseModel
+
+from playbacker.config import SafeLoader
+from playbacker.core.filetag import get_content_tag
+
+
+class _Dumper(yaml.SafeDumper):
+    """Dump YAML the way Prettier formats it: nested sequences are indented and
+    strings that need quotes get double quotes.
+    """
+
+    def increase_indent(self, flow: bool = False, indentless: bool = False) -> None:
+        return super().increase_indent(flow, False)
+
+    def choose_scalar_style(self) -> str:
+        style = super().choose_scalar_style()
+        return '"' if style == "'" else style
+
+
+def _as_model(type_: Any) -> type[BaseModel] | None:
+    if isinstance(type_, type) and issubclass(type_, BaseModel):
+        return type_
+
+
+def _get_submodel(model: type[BaseModel] | None, key: Any) -> type[BaseModel] | None:
+    if model is None:
+        return None
+    for field in model.__fields__.values():
+        if field.alias == key:
+            return _as_model(field.type_)
+
+
+def order_keys(value: Any, model: type[BaseModel] | None) -> Any:
+    """Sort mapping keys in order of model fields, unknown keys go last in
+    original order. Custom root models apply to every item.
+    """
+    if model and "__root__" in model.__fields__:
+        item_model = _as_model(model.__fields__["__root__"].type_)
+        if item_model is None:
+            return value
+        if isinstance(value, dict):
+            mapping = cast(dict[Any, Any], value)
+            return {k: order_keys(v, item_model) for k, v in mapping.items()}
+        if isinstance(value, list):
+            return [order_keys(v, item_model) for v in cast(list[Any], value)]
+        return value
+
+    if isinstance(value, dict):
+        fields = model.__fields__.values() if model else ()
+        positions = {field.alias: idx for idx, field in enumerate(fields)}
+        mapping = cast(dict[Any, Any], value)
+        keys = sorted(mapping, key=lambda key: positions.get(key, len(positions)))
+        return {k: order_keys(mapping[k], _get_submodel(model, k)) for k in keys}
+
+    if isinstance(value, list):
+        return [order_keys(v, model) for v in cast(list[Any], value)]
+
+    return value
+
+
+def _has_comments(text: str) -> bool:
+    # May find "#" inside quoted string, then file is just not reformatted
+    return bool(re.search(r"(^|\s)#", text, re.MULTILINE))
+
+
+def normalize_whitespace(text: str) -> str:
+    """Strip trailing spaces and repeated blank lines, end with single newline."""
+    lines = [line.rstrip() for line in text.strip("\n").splitlines()]
+    result: list[str] = []
+    for line in lines:
+        if line or (result and result[-1]):
+            result.append(line)
+    return "\n".join(result).strip("\n") + "\n"
+
+
+def format_yaml(text: str, model: type[BaseModel]) -> str:
+    """Format YAML document that follows `model`.
+
+    Documents with comments only get whitespace normalized so that comments are
+    not lost. Result is always parsed to the same content as source.
+    """
+    if _has_comments(text):
+        return normalize_whitespace(text)
+
+    content = yaml.load(text, Loader=SafeLoader)
+    if content is None:
+        return normalize_whitespace(text)
+
+    result: str = yaml.dump(
+        order_keys(content, model),
+        Dumper=_Dumper,
+        sort_keys=False,
+        allow_unicode=True,
+        default_flow_style=False,
+        width=4096,
+    )
+    if yaml.load(result, Loader=SafeLoader) != content:
+        return normalize_whitespace(text)
+    return result
+
+
+def format_yaml_file(path: Path, model: type[BaseModel]) -> bool:
+    """Format file in place. It is written only if content hash changed.
+    Return whether file was written.
+    """
+    source = path.read_bytes()
+    result = format_yaml(source.decode(), model).encode()
+    if get_content_tag(result) == get_content_tag(source):
+        return False
+
+    # Don't leave half-written file if interrupted. Replace target of symlink
+    # and keep permissions, like editors do
+    target = path.resolve()
+    fd, tmp = tempfile.mkstemp(dir=target.parent, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(result)
+    shutil.copymode(target, tmp)
+    os.replace(tmp, target)
+    return True
@@ -0,0 +1,51 @@
+import bisect
+import math
+from dataclasses import dataclass, field
+
+
+@dataclass
+class Histogram:
+    """Fixed-size histogram that is cheap to update from real-time threads.
+
+    Value goes to the first bucket which upper bound is not less than the value,
+    the last bucket is unbounded. Meant to have single writer, so no locks.
+    """
+
+    bounds: tuple[float, ...]
+    counts: list[int] = field(init=False, repr=False)
+    count: int = field(default=0, init=False)
+    sum: float = field(default=0, init=False)
+    min: float = field(default=math.inf, init=False)
+    max: float = field(default=-math.inf, init=False)
+
+    def __post_init__(self) -> None:
+        self.counts = [0] * (len(self.bounds) + 1)
+
+    def record(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def reset(self) -> None:
+        self.__post_init__()
+        self.count = 0
+        self.sum = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0
+
+    def buckets(self) -> list[tuple[float, int]]:
+        """Pairs of bucket upper bound and count."""
+        return list(zip((*self.bounds, math.inf), self.counts))
+
+    def __str__(self) -> str:
+        lines = [f"count={self.count} mean={self.mean:.6f} max={self.max:.6f}"]
+        lines.extend(f"<= {bound:>9}: {count}" for bound, count in self.buckets())
+        return "\n".join(lines)
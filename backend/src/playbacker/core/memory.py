@@ -0,0 +1,70 @@
+import gc
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Any
+
+from playbacker.core.histogram import Histogram
+
+
+def get_gc_pause_histogram() -> Histogram:
+    """Duration of garbage collections in seconds."""
+    return Histogram(
+        bounds=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+    )
+
+
+@dataclass
+class MemoryMode:
+    """Keeps cyclic garbage collector from pausing playback.
+
+    Long-lived objects are frozen after preload, full collections are postponed
+    while playing and happen on pause instead. Pauses are measured with `gc.callbacks`.
+    """
+
+    # Threshold of oldest generation while playing
+    playing_threshold: int = 1_000_000
+    # Pauses longer than this (in seconds) are reported
+    report_threshold: float = 0.001
+    pauses: Histogram = field(default_factory=get_gc_pause_histogram, repr=False)
+    # Thresholds to restore after playback
+    saved_threshold: tuple[int, int, int] | None = field(default=None, init=False)
+    collection_started: float = field(default=0, init=False, repr=False)
+
+    def install(self) -> None:
+        gc.callbacks.append(self._callback)
+
+    def uninstall(self) -> None:
+        if self._callback in gc.callbacks:
+            gc.callbacks.remove(self._callback)
+
+    def freeze(self) -> None:
+        """Move everything that exists now out of reach of collector."""
+        gc.collect()
+        gc.freeze()
+
+    def enter_playback(self) -> None:
+        if self.saved_threshold:
+            return
+        self.saved_threshold = gc.get_threshold()
+        gc.set_threshold(*self.saved_threshold[:2], self.playing_threshold)
+
+    def leave_playback(self) -> None:
+        if not self.saved_threshold:
+            return
+        gc.set_threshold(*self.saved_threshold)
+        self.saved_threshold = None
+        gc.collect()
+
+    def _callback(self, phase: str, info: dict[str, Any]) -> None:
+        if phase == "start":
+            self.collection_started = perf_counter()
+            return
+
+        elapsed = perf_counter() - self.collection_started
+        self.pauses.record(elapsed)
+
+        if elapsed > self.report_threshold:
+            print(
+                f"GC pause in generation {info['generation']}: {elapsed * 1000:.1f} ms"
+                + f" ({info['collected']} collected)"
+            )
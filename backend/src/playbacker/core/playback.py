@@ -1,13 +1,17 @@
 from collections.abc import Iterator, Sequence
 from contextlib import contextmanager
 from dataclasses import dataclass, field
+from functools import partial
 from typing import Generic, NamedTuple, Protocol, TypeVar
 
-from playbacker.core.clock import Clock
+from playbacker.core.clock import BaseClock, Clock, FrameClock, schedulers
+from playbacker.core.realtime import apply_realtime_settings
 from playbacker.core.settings import Settings
-from playbacker.core.stream import SounddeviceStream
+from playbacker.core.song import Song
+from playbacker.core.stream import SounddeviceMixer
 from playbacker.core.tempo import Tempo
 from playbacker.core.track import Shared, StreamBuilder, Track
+from playbacker.core.tracks.backing import BackingTrack
 from playbacker.core.tracks.countdown import CountdownTrack
 from playbacker.core.tracks.metronome import MetronomeTrack
 
@@ -18,12 +22,12 @@ _Tracks = TypeVar("_Tracks", bound=Sequence[Track])
 class BasePlayback(Generic[_Tracks], Protocol):
     """Playback that manages clock and tracks."""
 
-    clock: Clock = field(init=False)
+    clock: BaseClock = field(init=False)
     shared: Shared = field(default_factory=Shared, init=False)
     tracks: _Tracks = field(init=False)
 
     def __post_init__(self) -> None:
-        self.clock = Clock(callback=self.clock_callback)
+        self.clock = self.get_clock()
         self.tracks = self.get_tracks()
 
     def clock_callback(self) -> None:
@@ -32,6 +36,9 @@ class BasePlayback(Generic[_Tracks], Protocol):
         for track in self.tracks:
             track.tick()
 
+    def get_clock(self) -> BaseClock:
+        return Clock(callback=self.clock_callback)
+
     def get_tracks(self) -> _Tracks:
         ...
 
@@ -75,6 +82,8 @@ class BasePlayback(Generic[_Tracks], Protocol):
 class DefaultTracks(NamedTuple):
     metronome: MetronomeTrack
     countdown: CountdownTrack
+    multitrack: BackingTrack
+    guide: BackingTrack
 
 
 @dataclass
@@ -82,15 +91,39 @@ class Playback(BasePlayback[DefaultTracks]):
     """Playback that deals with settings and actual tracks"""
 
     settings: Settings = field(repr=False)
+    mixer: SounddeviceMixer = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.mixer = SounddeviceMixer(
+            sample_rate=self.settings.sample_rate,
+            channel_limit=self.settings.channel_limit,
+            device_name=self.settings.device,
+            prepare_thread=partial(
+                apply_realtime_settings, self.settings.realtime, "audio"
+            ),
+        )
+        super().__post_init__()
+
+    def get_clock(self) -> BaseClock:
+        if self.settings.transport == "thread":
+            return Clock(
+                callback=self.clock_callback,
+                scheduler=schedulers[self.settings.scheduler](),
+                prepare_thread=partial(
+                    apply_realtime_settings, self.settings.realtime, "clock"
+                ),
+            )
+
+        clock = FrameClock(
+            callback=self.clock_callback, sample_rate=self.settings.sample_rate
+        )
+        self.mixer.clock = clock
+        return clock
 
     def get_tracks(self) -> DefaultTracks:
         def create_builder(channel_map: list[int]) -> StreamBuilder:
-            return lambda g: SounddeviceStream(
-                sound_getter=g,
-                sample_rate=self.settings.sample_rate,
-                channel_map=channel_map,
-                channel_limit=self.settings.channel_limit,
-                device_name=self.settings.device,
+            return lambda g: self.mixer.add_input(
+                sound_getter=g, channel_map=channel_map
             )
 
         map = self.settings.channel_map
@@ -100,15 +133,31 @@ class Playback(BasePlayback[DefaultTracks]):
                 shared=self.shared,
                 sounds=self.settings.sounds.metronome,
                 stream_builder=create_builder(map.metronome),
+                prerender=self.settings.prerender,
             ),
             countdown=CountdownTrack(
                 shared=self.shared,
                 sounds=self.settings.sounds.countdown,
                 stream_builder=create_builder(map.guide),
+                prerender=self.settings.prerender,
+            ),
+            multitrack=BackingTrack(
+                shared=self.shared, stream_builder=create_builder(map.multitrack)
+            ),
+            guide=BackingTrack(
+                shared=self.shared, stream_builder=create_builder(map.guide)
             ),
         )
 
-    def start(self, tempo: Tempo) -> None:
+    def destroy(self) -> None:
+        super().destroy()
+        self.mixer.destroy()
+
+    def start(self, tempo: Tempo, song: Song | None = None) -> None:
+        paths = song.tracks if song else None
+
         with self.starting_ctx(tempo):
             self.tracks.metronome.start()
             self.tracks.countdown.start()
+            self.tracks.multitrack.start(paths.multitrack if paths else None)
+            self.tracks.guide.start(paths.guide if paths else None)
@@ -1,6 +1,12 @@
-from dataclasses import dataclass
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TypeVar
 
+from playbacker.core.memory import MemoryMode
 from playbacker.core.playback import Playback
+from playbacker.core.song import Song
 from playbacker.core.tempo import Tempo
 
 
@@ -10,18 +16,24 @@ class Player:
 
     playback: Playback
     tempo: Tempo | None = None
+    song: Song | None = None
     started: bool = False
     playing: bool = False
+    memory: MemoryMode
 
-    def __init__(self, playback: Playback) -> None:
+    def __init__(self, playback: Playback, memory: MemoryMode | None = None) -> None:
         self.playback = playback
+        self.memory = memory or MemoryMode()
 
-    def play(self, tempo: Tempo) -> None:
-        if self.tempo == tempo:
+    def play(self, tempo: Tempo, song: Song | None = None) -> None:
+        self.memory.enter_playback()
+
+        if self.tempo == tempo and self.song == song:
             self.playback.resume()
         else:
             self.tempo = tempo
-            self.playback.start(tempo=tempo)
+            self.song = song
+            self.playback.start(tempo=tempo, song=song)
 
         self.playing = True
         self.started = True
@@ -29,15 +41,27 @@ class Player:
     def pause(self) -> None:
         self.playback.pause()
         self.playing = False
+        # Safe point to collect garbage that was postponed while playing
+        self.memory.leave_playback()
 
     def reset(self) -> None:
         self.pause()
         self.tempo = None
+        self.song = None
 
     def stop(self) -> None:
         self.playback.destroy()
         self.started = False
 
+    def toggle_playing(self, tempo: Tempo, song: Song | None = None) -> None:
+        if self.playing:
+            self.pause()
+        else:
+            self.play(tempo, song=song)
+
+    def toggle_guide_enabled(self) -> None:
+        self.guide_enabled = not self.guide_enabled
+
     def prepare_for_switch(self):
         if self.started:
             self.pause()
@@ -50,8 +74,52 @@ class Player:
     @guide_enabled.setter
     def guide_enabled(self, value: bool):
         self.playback.tracks.countdown.enabled = value
+        self.playback.tracks.guide.enabled = value
 
     def time(self) -> float:
         if self.started and self.tempo:
             return self.playback.shared.tempo.lag * self.playback.shared.position
         return 0
+
+
+_T = TypeVar("_T")
+
+
+@dataclass
+class AsyncPlayer:
+    """Asyncio facade over Player.
+
+    Commands are queued to dedicated control thread and run one by one, so opening
+    device or decoding files doesn't block event loop.
+    """
+
+    player: Player
+    # Seconds to wait for command. Command that didn't start by then is dropped.
+    timeout: float = 10
+    executor: ThreadPoolExecutor = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="player-control"
+        )
+
+    async def run(self, command: Callable[[], _T]) -> _T:
+        """Run command on control thread, raise TimeoutError if it takes too long."""
+        future = asyncio.get_running_loop().run_in_executor(self.executor, command)
+        return await asyncio.wait_for(future, self.timeout)
+
+    async def toggle_playing(self, tempo: Tempo, song: Song | None = None) -> None:
+        await self.run(lambda: self.player.toggle_playing(tempo, song=song))
+
+    async def toggle_guide_enabled(self) -> None:
+        await self.run(self.player.toggle_guide_enabled)
+
+    async def prepare_for_switch(self) -> None:
+        await self.run(self.player.prepare_for_switch)
+
+    async def reset(self) -> None:
+        await self.run(self.player.reset)
+
+    async def stop(self) -> None:
+        await self.run(self.player.stop)
+        self.executor.shutdown()
@@ -0,0 +1,62 @@
+import os
+import sys
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+SchedulingPolicy = Literal["fifo", "rr"]
+
+
+class RealtimeSettings(BaseModel, frozen=True):
+    # Real-time scheduling policy, threads are scheduled normally if not set
+    policy: SchedulingPolicy | None = None
+    priority: int = Field(default=50, ge=1, le=99)
+    # CPUs to pin threads to, any CPU if not set
+    cpus: list[int] | None = None
+
+
+def _report(message: str) -> None:
+    print(message, file=sys.stderr)
+
+
+def _set_affinity(cpus: list[int], thread_name: str) -> None:
+    if not hasattr(os, "sched_setaffinity"):
+        _report(f"Can't pin {thread_name} thread to CPUs: not supported on this OS.")
+        return
+
+    try:
+        os.sched_setaffinity(0, cpus)
+    except OSError as err:
+        _report(f"Can't pin {thread_name} thread to CPUs {cpus}: {err}.")
+
+
+def _set_scheduler(policy: SchedulingPolicy, priority: int, thread_name: str) -> None:
+    if not hasattr(os, "sched_setscheduler"):
+        _report(
+            f"Can't set real-time priority for {thread_name} thread:"
+            + " not supported on this OS."
+        )
+        return
+
+    value = os.SCHED_FIFO if policy == "fifo" else os.SCHED_RR
+    try:
+        os.sched_setscheduler(0, value, os.sched_param(priority))
+    except PermissionError:
+        _report(
+            f"Not permitted to set {policy.upper()} priority {priority}"
+            + f" for {thread_name} thread, it runs with normal priority."
+            + " Allow real-time priority for your user (`rtprio` in"
+            + " /etc/security/limits.conf) or grant CAP_SYS_NICE to Python."
+        )
+    except OSError as err:
+        _report(f"Can't set real-time priority for {thread_name} thread: {err}.")
+
+
+def apply_realtime_settings(settings: RealtimeSettings, thread_name: str) -> None:
+    """Apply settings to calling thread. Errors are reported, not raised:
+    playback still works without real-time priority.
+    """
+    if settings.cpus is not None:
+        _set_affinity(settings.cpus, thread_name)
+    if settings.policy:
+        _set_scheduler(settings.policy, settings.priority, thread_name)
@@ -0,0 +1,76 @@
+from dataclasses import dataclass, field
+
+import numpy
+
+from playbacker.core.audiofile import AudioArray
+
+
+@dataclass
+class RingBuffer:
+    """Single-producer single-consumer ring buffer of audio frames.
+
+    Backed by preallocated array. Producer only moves `written`, consumer only moves
+    `consumed`; integer assignment is atomic, so neither side takes locks and audio
+    callback can drain it without waiting for producer thread.
+    """
+
+    capacity: int
+    channels: int
+    data: AudioArray = field(init=False, repr=False)
+    written: int = field(default=0, init=False)
+    consumed: int = field(default=0, init=False)
+    # Producer won't write anymore, so short reads are not underruns
+    closed: bool = field(default=False, init=False)
+    # Reads that got less frames than requested before buffer was closed
+    underruns: int = field(default=0, init=False)
+    # Largest number of frames that were waiting in buffer at once
+    high_water: int = field(default=0, init=False)
+
+    def __post_init__(self) -> None:
+        self.data = numpy.zeros((self.capacity, self.channels))
+
+    @property
+    def available(self) -> int:
+        return self.written - self.consumed
+
+    @property
+    def fill(self) -> float:
+        return self.available / self.capacity
+
+    def write(self, chunk: AudioArray) -> int:
+        """Write as many frames as fit, return their number."""
+        size = min(len(chunk), self.capacity - self.available)
+        start = self.written % self.capacity
+        first = min(size, self.capacity - start)
+        self.data[start : start + first] = chunk[:first]
+        self.data[: size - first] = chunk[first:size]
+        self.written += size
+
+        if (available := self.available) > self.high_water:
+            self.high_water = available
+        return size
+
+    def close(self) -> None:
+        self.closed = True
+
+    def read_into(self, out: AudioArray) -> int:
+        """Copy up to `len(out)` frames into `out`, return their number.
+
+        On underrun rest of `out` is filled with silence so that playback keeps
+        its pace. Only after buffer is closed and drained fewer frames are returned.
+        """
+        # Checked before reading: if set, everything that's left is in buffer
+        closed = self.closed
+        size = min(len(out), self.available)
+        start = self.consumed % self.capacity
+        first = min(size, self.capacity - start)
+        out[:first] = self.data[start : start + first]
+        out[first:size] = self.data[: size - first]
+        self.consumed += size
+
+        if size == len(out) or closed:
+            return size
+
+        self.underruns += 1
+        out[size:].fill(0)
+        return len(out)
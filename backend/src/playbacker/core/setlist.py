@@ -1,7 +1,13 @@
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from pathlib import Path
 from typing import Any
 
+import yaml
 from pydantic import BaseModel
 
+from playbacker.config import read_yaml
+from playbacker.core.filetag import combine_tags, get_file_tag
 from playbacker.core.song import Song
 
 
@@ -18,10 +24,10 @@ class NoSongInStorageError(Exception):
         super().__init__()
 
 
-def _find_song_in_storage(name: str, storage: list[Song]):
-    for song in storage:
-        if song.name.casefold() == name.casefold():
-            return song
+def _find_song_in_storage(name: str, storage: Mapping[str, Song]):
+    """Find song in storage keyed by casefolded name."""
+    if song := storage.get(name.casefold()):
+        return song
 
     raise NoSongInStorageError(f'Song "{name}" is not present in storage')
 
@@ -30,7 +36,7 @@ class FileSetlist(BaseModel):
     __root__: list[str]
 
 
-def load_setlist(name: str, content: Any, songs: list[Song]) -> Setlist:
+def load_setlist(name: str, content: Any, songs: Mapping[str, Song]) -> Setlist:
     fsetlist = FileSetlist(__root__=content)
     selected_songs = [_find_song_in_storage(n, songs) for n in fsetlist.__root__]
     return Setlist(name=name, songs=selected_songs)
@@ -38,3 +44,73 @@ def load_setlist(name: str, content: Any, songs: list[Song]) -> Setlist:
 
 def prettify_setlist_stem(stem: str) -> str:
     return " ".join(w.capitalize() for w in stem.split())
+
+
+@dataclass(frozen=True)
+class SetlistEntry:
+    path: Path
+    # File tag of parsed content, None if file failed to parse
+    tag: str | None
+    content: Any
+
+
+@dataclass
+class SetlistIndex:
+    """Setlist files in directory keyed by pretty name, with parsed content.
+
+    Kept up to date with `update()` on filesystem events, so listing and lookup
+    don't touch disk. Updates run in a thread while requests read the index:
+    `entries` is replaced as a whole, never changed in place.
+    """
+
+    directory: Path
+    entries: dict[str, SetlistEntry] = field(
+        default_factory=dict[str, SetlistEntry], init=False
+    )
+    names: list[str] = field(default_factory=list[str], init=False)
+    # Changes when list of names changes. Set after names, read it before them
+    names_tag: str = field(default="", init=False)
+
+    def _is_setlist(self, path: Path) -> bool:
+        return path.parent == self.directory and path.suffix == ".yaml"
+
+    def _read(self, path: Path) -> SetlistEntry:
+        try:
+            tag = get_file_tag(path)
+            return SetlistEntry(path=path, tag=tag, content=read_yaml(path))
+        except (OSError, yaml.YAMLError) as err:
+            print(f"Failed to load {path}: {err}")
+            return SetlistEntry(path=path, tag=None, content=None)
+
+    def _set_entries(self, entries: dict[str, SetlistEntry]) -> None:
+        names = sorted(entries, reverse=True)
+        self.entries = entries
+        self.names = names
+        self.names_tag = combine_tags(names)
+
+    def refresh(self) -> None:
+        self._set_entries(
+            {
+                prettify_setlist_stem(path.stem): self._read(path)
+                for path in self.directory.glob("*.yaml")
+            }
+        )
+
+    def update(self, path: Path) -> None:
+        """Reload, add or remove setlist after its file changed."""
+        if not self._is_setlist(path):
+            return
+
+        name = prettify_setlist_stem(path.stem)
+        entries = dict(self.entries)
+        if path.exists():
+            entries[name] = self._read(path)
+        elif (entry := entries.get(name)) and entry.path == path:
+            del entries[name]
+        self._set_entries(entries)
+
+    def get(self, name: str) -> SetlistEntry | None:
+        return self.entries.get(name)
+
+    def get_path(self, name: str) -> Path | None:
+        return entry.path if (entry := self.entries.get(name)) else None
@@ -1,13 +1,22 @@
 from pathlib import Path
-from typing import Any, TypedDict
+from typing import Any, Literal, TypedDict
 
-import sounddevice
 from pydantic import BaseModel, Field
 
-from playbacker.core.audiofile import AudioFile
+from playbacker.core.audiofile import (
+    AudioCache,
+    AudioFile,
+    get_default_cache_dir,
+    preload_audiofiles,
+)
+from playbacker.core.clock import SchedulerName
+from playbacker.core.realtime import RealtimeSettings
 from playbacker.core.tracks.countdown import CountdownSounds
 from playbacker.core.tracks.metronome import MetronomeSounds
 
+# Whether clock ticks from own thread or from frames played by audio callback
+Transport = Literal["thread", "audio"]
+
 
 class _Sounds(BaseModel):
     metronome: MetronomeSounds
@@ -26,6 +35,10 @@ class Settings(BaseModel, frozen=True):
     channel_map: _ChannelMap
     sounds: _Sounds
     channel_limit: int
+    transport: Transport
+    scheduler: SchedulerName
+    prerender: bool
+    realtime: RealtimeSettings
 
 
 class _Device(BaseModel):
@@ -54,9 +67,19 @@ class _SoundPaths(BaseModel):
     countdown: _CountdownPaths
 
 
+class _CacheSettings(BaseModel):
+    directory: Path = Field(default_factory=get_default_cache_dir)
+    max_size_mb: int = 2048
+
+
 class _FileSettings(BaseModel):
     devices: list[_Device]
     sounds: _SoundPaths
+    cache: _CacheSettings = Field(default_factory=_CacheSettings)
+    transport: Transport = "thread"
+    scheduler: SchedulerName = "sleep"
+    prerender: bool = False
+    realtime: RealtimeSettings = Field(default_factory=RealtimeSettings)
 
 
 class _DeviceProps(TypedDict):
@@ -72,6 +95,9 @@ def _find_device_in_settings(name: str, devices: list[_Device]) -> _Device:
 
 
 def _get_device_props(device: _Device) -> _DeviceProps:
+    # Initializes PortAudio, only commands that need device pay for it
+    import sounddevice
+
     return sounddevice.query_devices(  # pyright: ignore
         device=device.name, kind="output"
     )
@@ -92,34 +118,79 @@ def _get_channel_limit(device: _Device, device_props: _DeviceProps):
     return limit
 
 
+def _get_audio_cache(settings: _FileSettings) -> AudioCache:
+    return AudioCache(
+        directory=settings.cache.directory.expanduser(),
+        max_size=settings.cache.max_size_mb * 1024 * 1024,
+    )
+
+
+def _get_sounds(sounds: _SoundPaths, sample_rate: int, cache: AudioCache) -> _Sounds:
+    def file(path: Path) -> AudioFile:
+        return AudioFile(path, sample_rate, cache)
+
+    metronome = sounds.metronome
+    countdown = sounds.countdown
+
+    return _Sounds(
+        metronome=MetronomeSounds(
+            accent=file(metronome.accent),
+            tick_1_4=file(metronome.tick_1_4),
+            tick_1_8=file(metronome.tick_1_8),
+            tick_1_16=file(metronome.tick_1_16),
+        ),
+        countdown=CountdownSounds(
+            count_1=file(countdown.count_1),
+            count_2=file(countdown.count_2),
+            count_3=file(countdown.count_3),
+            count_4=file(countdown.count_4),
+        ),
+    )
+
+
 def _convert_file_settings(settings: _FileSettings, device_name: str) -> Settings:
     device = _find_device_in_settings(name=device_name, devices=settings.devices)
     props = _get_device_props(device)
     channel_limit = _get_channel_limit(device, props)
-    metronome = settings.sounds.metronome
-    countdown = settings.sounds.countdown
 
     return Settings(
         device=device.name,
         sample_rate=device.sample_rate,
         channel_map=device.channel_map,
-        sounds=_Sounds(
-            metronome=MetronomeSounds(
-                accent=AudioFile(metronome.accent, device.sample_rate),
-                tick_1_4=AudioFile(metronome.tick_1_4, device.sample_rate),
-                tick_1_8=AudioFile(metronome.tick_1_8, device.sample_rate),
-                tick_1_16=AudioFile(metronome.tick_1_16, device.sample_rate),
-            ),
-            countdown=CountdownSounds(
-                count_1=AudioFile(countdown.count_1, device.sample_rate),
-                count_2=AudioFile(countdown.count_2, device.sample_rate),
-                count_3=AudioFile(countdown.count_3, device.sample_rate),
-                count_4=AudioFile(countdown.count_4, device.sample_rate),
-            ),
+        sounds=_get_sounds(
+            settings.sounds, device.sample_rate, _get_audio_cache(settings)
         ),
         channel_limit=channel_limit,
+        transport=settings.transport,
+        scheduler=settings.scheduler,
+        prerender=settings.prerender,
+        realtime=settings.realtime,
     )
 
 
 def load_settings(content: Any, device_name: str) -> Settings:
     return _convert_file_settings(_FileSettings(**content), device_name)
+
+
+def preload_sounds(settings: Settings) -> list[tuple[AudioFile, float]]:
+    """Load all sounds before first playback, return time spent on each one."""
+    sounds = settings.sounds
+    return preload_audiofiles((*sounds.metronome, *sounds.countdown))
+
+
+def load_audio_cache(content: Any) -> AudioCache:
+    return _get_audio_cache(_FileSettings(**content))
+
+
+def get_all_audiofiles(content: Any) -> list[AudioFile]:
+    """Sounds for every device in config, without querying devices."""
+    settings = _FileSettings(**content)
+    cache = _get_audio_cache(settings)
+    sample_rates = sorted({device.sample_rate for device in settings.devices})
+    files: list[AudioFile] = []
+
+    for sample_rate in sample_rates:
+        sounds = _get_sounds(settings.sounds, sample_rate, cache)
+        files.extend((*sounds.metronome, *sounds.countdown))
+
+    return files
@@ -1,38 +1,57 @@
+from collections.abc import Iterable
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any
+from typing import Any, cast
 
 from pydantic import BaseModel, Field
 
+from playbacker.config import read_yaml
+from playbacker.core.filetag import get_file_tag
 from playbacker.core.tempo import Tempo
 
 
+class _TrackPaths(BaseModel, frozen=True):
+    multitrack: Path | None = None
+    guide: Path | None = None
+
+
 class _SongBase(BaseModel, frozen=True):
     artist: str | None
     tempo: Tempo
+    tracks: _TrackPaths = Field(default_factory=_TrackPaths)
 
 
 class Song(_SongBase, frozen=True):
     name: str
 
 
-class _TrackPaths(BaseModel):
-    multitrack: Path | None = None
-    guide: Path | None = None
-
-
 class _FileSong(_SongBase, frozen=True):
-    tracks: _TrackPaths = Field(default_factory=_TrackPaths)
+    pass
 
 
 class _FileSongs(BaseModel):
     __root__: dict[str, _FileSong]
 
 
-def _convert_file_song(name: str, song: _FileSong) -> Song:
+def _resolve_track_paths(paths: _TrackPaths, directory: Path) -> _TrackPaths:
+    """Relative paths point into `directory`, not to current working directory."""
+    return _TrackPaths(
+        multitrack=directory / paths.multitrack if paths.multitrack else None,
+        guide=directory / paths.guide if paths.guide else None,
+    )
+
+
+def _convert_file_song(
+    name: str, song: _FileSong, directory: Path | None = None
+) -> Song:
+    tracks = song.tracks
+    if directory is not None:
+        tracks = _resolve_track_paths(tracks, directory)
     return Song(
         name=name,
         artist=song.artist,
         tempo=song.tempo,
+        tracks=tracks,
     )
 
 
@@ -42,3 +61,53 @@ def load_songs(content: Any) -> list[Song]:
         _convert_file_song(name=name, song=song)
         for name, song in songs.__root__.items()
     ]
+
+
+def index_songs(songs: Iterable[Song]) -> dict[str, Song]:
+    """Map casefolded names to songs. First song wins if names collide."""
+    index: dict[str, Song] = {}
+    for song in songs:
+        index.setdefault(song.name.casefold(), song)
+    return index
+
+
+@dataclass
+class SongIndex:
+    """Songs from songs file keyed by casefolded name, parsed once.
+
+    On refresh only songs which content changed are validated again.
+    """
+
+    path: Path
+    songs: dict[str, Song] = field(default_factory=dict[str, Song], init=False)
+    # Raw content of every song by its name, to find songs that didn't change
+    content: dict[str, Any] = field(default_factory=dict[str, Any], init=False)
+    # File tag of loaded content
+    tag: str = field(default="", init=False)
+
+    def _load_song(self, name: str, content: Any) -> Song:
+        if (song := self.songs.get(name.casefold())) and song.name == name:
+            if self.content.get(name) == content:
+                return song
+        return _convert_file_song(
+            name=name,
+            song=_FileSong.parse_obj(content),
+            # Songs file lives in config directory
+            directory=self.path.parent,
+        )
+
+    def refresh(self) -> None:
+        tag = get_file_tag(self.path)
+        content = read_yaml(self.path)
+        if not isinstance(content, dict):
+            _FileSongs(__root__=content)  # Raises validation error
+
+        content = {str(k): v for k, v in cast(dict[Any, Any], content).items()}
+        songs = [self._load_song(name, value) for name, value in content.items()]
+        self.content = content
+        self.songs = index_songs(songs)
+        # Requests read tag before songs, so new tag never comes with old songs
+        self.tag = tag
+
+    def get(self, name: str) -> Song | None:
+        return self.songs.get(name.casefold())
@@ -2,11 +2,19 @@ import time
 from collections.abc import Callable
 from dataclasses import dataclass, field
 from threading import Event, Thread
-from typing import Any, Protocol
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, Protocol
 
-import sounddevice
+import numpy
 
 from playbacker.core.audiofile import AudioArray
+from playbacker.core.clock import FrameClock
+from playbacker.core.histogram import Histogram
+
+if TYPE_CHECKING:
+    # Importing sounddevice initializes PortAudio, so it is done only when
+    # stream is opened
+    import sounddevice
 
 SoundGetter = Callable[[int], AudioArray | None]
 
@@ -25,38 +33,94 @@ class Stream(Protocol):
 def convert_channel_map_to_coreaudio_format(
     map: list[int], channel_limit: int
 ) -> list[int]:
-    channel_map: dict[int, int] = {0: -1}
+    channels = set(map)
+    channel_map: list[int] = [-1]
     prev_idx = -1
 
-    for _i in range(channel_limit):
-        idx = _i + 1
-
-        if idx in map:
-            channel_map[idx] = prev_idx + 1
+    for idx in range(1, channel_limit + 1):
+        if idx in channels:
             prev_idx += 1
+            channel_map.append(prev_idx)
         else:
-            channel_map[idx] = -1
+            channel_map.append(-1)
 
-    return list(channel_map.values())
+    return channel_map
 
 
-def allocate_data_to_channels(
-    data: AudioArray, channel_map: list[int], channel_limit: int
-) -> dict[int, AudioArray]:
-    channel_to_data: dict[int, AudioArray] = {}
-    prev_idx = 0
+def compile_channel_gains(channel_map: list[int], channel_limit: int) -> AudioArray:
+    """Compile channel map into gain matrix of shape (data channels, channel limit).
 
-    for _i in range(channel_limit):
-        if prev_idx >= data.shape[1]:  # no more channels
-            break
+    N-th channel of audio data goes to N-th (in ascending order) channel from map.
+    """
+    channels = set(channel_map)
+    outputs = [idx for idx in range(channel_limit) if idx + 1 in channels]
+    gains = numpy.zeros((len(outputs), channel_limit))
+    gains[range(len(outputs)), outputs] = 1
+    return gains
 
-        idx = _i + 1
 
-        if idx in channel_map:
-            channel_to_data[idx] = data[:, prev_idx : prev_idx + 1]
-            prev_idx += 1
+def route_data_to_channels(
+    data: AudioArray, gains: AudioArray, out: AudioArray
+) -> None:
+    """Write routed data to the beginning of `out` without allocating arrays.
+
+    `out` has to be C-contiguous and of the same dtype as data and gains.
+    """
+    channels = min(data.shape[1], len(gains))
+    numpy.matmul(data[:, :channels], gains[:channels], out=out[: len(data)])
+
+
+def resize_buffer(buffer: AudioArray, frames: int) -> AudioArray:
+    """Reallocate buffer only if callback requested more frames than ever before."""
+    if len(buffer) >= frames:
+        return buffer
+    return numpy.zeros((frames, *buffer.shape[1:]), dtype=buffer.dtype)
+
+
+def get_callback_duration_histogram() -> Histogram:
+    """Wall time of audio callback in seconds."""
+    return Histogram(
+        bounds=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05)
+    )
+
+
+def get_callback_load_histogram() -> Histogram:
+    """Wall time of audio callback relative to duration of audio it produced."""
+    return Histogram(bounds=(0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 1))
 
-    return channel_to_data
+
+@dataclass
+class CallbackStats:
+    """Audio callback timing and status flags.
+
+    Written only from audio thread, so it can be read while playing.
+    """
+
+    duration: Histogram = field(default_factory=get_callback_duration_histogram)
+    load: Histogram = field(default_factory=get_callback_load_histogram)
+    output_underflows: int = 0
+    priming_outputs: int = 0
+
+    def record(
+        self,
+        status: "sounddevice.CallbackFlags",
+        frames: int,
+        sample_rate: int,
+        elapsed: float,
+    ) -> None:
+        self.duration.record(elapsed)
+        if frames:
+            self.load.record(elapsed * sample_rate / frames)
+        if status.output_underflow:
+            self.output_underflows += 1
+        if status.priming_output:
+            self.priming_outputs += 1
+
+    def reset(self) -> None:
+        self.duration.reset()
+        self.load.reset()
+        self.output_underflows = 0
+        self.priming_outputs = 0
 
 
 @dataclass
@@ -66,9 +130,14 @@ class SounddeviceStream(Stream):
     channel_map: list[int]
     channel_limit: int = field(repr=False)
     device_name: str | None = field(repr=False)
-    stream: sounddevice.OutputStream = field(init=False, repr=False)
+    stream: "sounddevice.OutputStream" = field(init=False, repr=False)
+    gains: AudioArray = field(init=False, repr=False)
+    buffer: AudioArray = field(init=False, repr=False)
+    stats: CallbackStats = field(default_factory=CallbackStats, init=False, repr=False)
 
     def _init_stream(self) -> None:
+        import sounddevice
+
         map = convert_channel_map_to_coreaudio_format(
             self.channel_map, self.channel_limit
         )
@@ -83,6 +152,8 @@ class SounddeviceStream(Stream):
         self.ready.set()
 
     def __post_init__(self) -> None:
+        self.gains = compile_channel_gains(self.channel_map, self.channel_limit)
+        self.buffer = numpy.zeros((4096, self.channel_limit))
         Thread(target=self._init_stream, daemon=True).start()
 
     def _destroy_stream(self) -> None:
@@ -94,19 +165,144 @@ class SounddeviceStream(Stream):
         Thread(target=self._destroy_stream).start()
 
     def _fill_outdata(self, outdata: AudioArray, data: AudioArray) -> None:
-        map = allocate_data_to_channels(data, self.channel_map, self.channel_limit)
-        size = len(data)
-        for idx, data_for_channel in map.items():
-            outdata[:size, idx - 1 : idx] = data_for_channel
+        self.buffer = resize_buffer(self.buffer, len(outdata))
+        buffer = self.buffer[: len(outdata)]
+        route_data_to_channels(data, self.gains, buffer)
+        buffer[len(data) :].fill(0)
+        numpy.copyto(outdata, buffer[:, : outdata.shape[1]])
 
     def _callback(
         self,
         outdata: AudioArray,
         frames: int,
         time: Any,
-        status: sounddevice.CallbackFlags,
+        status: "sounddevice.CallbackFlags",
     ) -> None:
+        started = perf_counter()
+
         if (data := self.sound_getter(frames)) is None:
             outdata.fill(0)
         else:
             self._fill_outdata(outdata, data)
+
+        self.stats.record(status, frames, self.sample_rate, perf_counter() - started)
+
+
+@dataclass
+class MixerInput(Stream):
+    """Stream that is played through SounddeviceMixer instead of own OutputStream."""
+
+    channel_map: list[int]
+    mixer: "SounddeviceMixer" = field(repr=False)
+    gains: AudioArray = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.ready = self.mixer.ready
+        self.gains = compile_channel_gains(self.channel_map, self.mixer.channel_limit)
+
+    def destroy(self) -> None:
+        self.mixer.remove_input(self)
+
+
+@dataclass
+class SounddeviceMixer:
+    """Single sounddevice.OutputStream per device that sums all of its inputs."""
+
+    sample_rate: int = field(repr=False)
+    channel_limit: int = field(repr=False)
+    device_name: str | None
+    inputs: list[MixerInput] = field(
+        default_factory=list[MixerInput], init=False, repr=False
+    )
+    ready: Event = field(default_factory=Event, init=False, repr=False)
+    stream: "sounddevice.OutputStream" = field(init=False, repr=False)
+    buffer: AudioArray = field(init=False, repr=False)
+    # Space for routed data of a single input before it's added to buffer
+    scratch: AudioArray = field(init=False, repr=False)
+    # Transport that is driven by frames this mixer plays
+    clock: FrameClock | None = field(default=None, init=False, repr=False)
+    stats: CallbackStats = field(default_factory=CallbackStats, init=False, repr=False)
+    # Called from audio thread before first callback is processed
+    prepare_thread: Callable[[], None] | None = field(default=None, repr=False)
+    thread_prepared: bool = field(default=False, init=False, repr=False)
+
+    def _init_stream(self) -> None:
+        import sounddevice
+
+        self.stream = sounddevice.OutputStream(
+            samplerate=self.sample_rate,
+            device=self.device_name,
+            channels=self.channel_limit,
+            dtype="float32",
+            callback=self._callback,
+        )
+        self.stream.start()
+        self.ready.set()
+
+    def __post_init__(self) -> None:
+        self.buffer = numpy.zeros((4096, self.channel_limit))
+        self.scratch = numpy.zeros_like(self.buffer)
+        Thread(target=self._init_stream, daemon=True).start()
+
+    def add_input(
+        self, sound_getter: SoundGetter, channel_map: list[int]
+    ) -> MixerInput:
+        input = MixerInput(
+            sound_getter=sound_getter,
+            sample_rate=self.sample_rate,
+            channel_map=channel_map,
+            mixer=self,
+        )
+        # Replace the list instead of mutating it: callback may iterate over it
+        self.inputs = [*self.inputs, input]
+        return input
+
+    def remove_input(self, input: MixerInput) -> None:
+        self.inputs = [i for i in self.inputs if i is not input]
+
+    def _destroy_stream(self) -> None:
+        time.sleep(0.4)
+        self.stream.stop()
+        self.stream.close()
+
+    def destroy(self) -> None:
+        Thread(target=self._destroy_stream).start()
+
+    def _mix(self, buffer: AudioArray, input: MixerInput, data: AudioArray) -> None:
+        size = len(data)
+        route_data_to_channels(data, input.gains, self.scratch)
+        numpy.add(buffer[:size], self.scratch[:size], out=buffer[:size])
+
+    def _callback(
+        self,
+        outdata: AudioArray,
+        frames: int,
+        time: Any,
+        status: "sounddevice.CallbackFlags",
+    ) -> None:
+        if not self.thread_prepared:
+            self.thread_prepared = True
+            if self.prepare_thread:
+                self.prepare_thread()
+
+        started = perf_counter()
+        self.buffer = resize_buffer(self.buffer, frames)
+        self.scratch = resize_buffer(self.scratch, frames)
+        buffer = self.buffer[:frames]
+        buffer.fill(0)
+        offset = 0
+
+        while offset < frames:
+            # Split block on clock ticks so sounds start at exact frame
+            size = frames - offset
+            if self.clock:
+                size = self.clock.advance(size)
+
+            for input in self.inputs:
+                if (data := input.sound_getter(size)) is not None:
+                    self._mix(buffer[offset:], input, data)
+
+            offset += size
+
+        numpy.copyto(outdata, buffer)
+        self.stats.record(status, frames, self.sample_rate, perf_counter() - started)
@@ -1,26 +1,37 @@
-from typing import Literal
+from typing import Any, Literal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, PrivateAttr
 
 TimeSignature = Literal["4/4", "6/8", "12/4"]
 Duration = Literal["1/4", "1/8", "1/16"]
 
 
 class Tempo(BaseModel, frozen=True):
-    bpm: float
+    bpm: float = Field(gt=0)
     time_signature: TimeSignature
     duration: Duration
+    _lag: float = PrivateAttr()
+    _beats_per_bar: int = PrivateAttr()
+
+    def __init__(self, **data: Any) -> None:
+        super().__init__(**data)
+        # Tempo is accessed from audio callbacks, don't compute these every time.
+        # Model is frozen, so set private attributes the way pydantic does.
+        lag = 60 / self.bpm / 4
+        object.__setattr__(self, "_lag", lag)
+        beats_per_bar = int(self.time_signature.split("/")[0])
+        object.__setattr__(self, "_beats_per_bar", beats_per_bar)
 
-    @property  # TODO: Cached
+    @property
     def lag(self) -> float:
-        return 60 / self.bpm / 4
+        return self._lag
 
     @property
     def beats_per_bar(self) -> int:
-        return int(self.time_signature[0])
+        return self._beats_per_bar
 
     def get_start_of_bar(self, position: int) -> int:
-        divider = self.beats_per_bar * 4
+        divider = self._beats_per_bar * 4
         return position - position % divider
 
     def __str__(self) -> str:
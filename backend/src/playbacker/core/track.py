@@ -1,9 +1,11 @@
 from collections.abc import Callable, Iterable
 from dataclasses import dataclass, field
-from typing import Generic, Protocol, TypeVar
+from typing import Generic, NamedTuple, Protocol, TypeVar
+
+import numpy
 
 from playbacker.core.audiofile import AudioArray, AudioFile
-from playbacker.core.stream import SoundGetter, Stream
+from playbacker.core.stream import SoundGetter, Stream, resize_buffer
 from playbacker.core.tempo import Tempo
 
 
@@ -40,6 +42,73 @@ def trim_audio_array(
     return trimmed
 
 
+class SoundEvent(NamedTuple):
+    offset: int
+    data: AudioArray
+    # Sound is cut after this number of frames
+    limit: int | None = None
+
+
+def render_sound_events(
+    events: Iterable[SoundEvent], length: int, loop: bool
+) -> AudioArray:
+    """Mix sounds into single buffer.
+
+    When looped, tails that don't fit are added to the beginning of buffer.
+    """
+    events = list(events)
+    channels = max((e.data.shape[1] for e in events), default=1)
+    result = numpy.zeros((length, channels))
+
+    for offset, data, limit in events:
+        data = data[:limit]
+
+        while len(data) and offset < length:
+            size = min(len(data), length - offset)
+            result[offset : offset + size, : data.shape[1]] += data[:size]
+            data = data[size:] if loop else data[:0]
+            offset = 0
+
+    return result
+
+
+@dataclass
+class RenderedSound:
+    """Sound rendered for a tempo that is played with read cursor."""
+
+    data: AudioArray = field(repr=False)
+    tempo: Tempo
+    sample_rate: int = field(repr=False)
+    loop: bool
+    cursor: int = field(default=0, init=False)
+    out: AudioArray = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.out = numpy.zeros((4096, self.data.shape[1]))
+
+    def seek(self, position: int) -> None:
+        frame = round(position * self.tempo.lag * self.sample_rate)
+        self.cursor = frame % len(self.data) if self.loop else frame
+
+    def read(self, frames: int) -> AudioArray | None:
+        if not self.loop:
+            data = self.data[self.cursor : self.cursor + frames]
+            self.cursor += frames
+            return data if len(data) else None
+
+        self.out = resize_buffer(self.out, frames)
+        out = self.out[:frames]
+        filled = 0
+
+        while filled < frames:
+            size = min(frames - filled, len(self.data) - self.cursor)
+            out[filled : filled + size] = self.data[self.cursor : self.cursor + size]
+            filled += size
+            self.cursor = (self.cursor + size) % len(self.data)
+
+        return out
+
+
 _Sounds = TypeVar("_Sounds", bound=Iterable[AudioFile | None])
 StreamBuilder = Callable[[SoundGetter], Stream]
 
@@ -52,6 +121,9 @@ class SoundTrack(Track, Generic[_Sounds], Protocol):
     current_frame: int = field(default=0, init=False)
     sounds: _Sounds = field(repr=False)
     enabled: bool = field(default=True, init=False)
+    # Play sound rendered for whole tempo instead of picking sounds on ticks
+    prerender: bool = False
+    rendered: RenderedSound | None = field(default=None, init=False, repr=False)
 
     def __post_init__(self) -> None:
         self.stream = self.stream_builder(self.callback)
@@ -59,10 +131,24 @@ class SoundTrack(Track, Generic[_Sounds], Protocol):
     def get_sound(self) -> AudioArray | None:  # pragma: no cover
         ...
 
+    def render(self, tempo: Tempo) -> RenderedSound:  # pragma: no cover
+        ...
+
     def _should_be_silent(self) -> bool:
         return not self.enabled or self.paused or self.shared.configuring
 
+    def _read_rendered(self, frames: int) -> AudioArray | None:
+        if self.paused or self.shared.configuring or not self.rendered:
+            return
+
+        # Keep reading while disabled to stay in sync with clock
+        data = self.rendered.read(frames)
+        return data if self.enabled else None
+
     def callback(self, frames: int) -> AudioArray | None:
+        if self.prerender:
+            return self._read_rendered(frames)
+
         if self._should_be_silent() or (data := self.get_sound()) is None:
             return
 
@@ -70,7 +156,14 @@ class SoundTrack(Track, Generic[_Sounds], Protocol):
         self.current_frame += len(trimmed)
         return trimmed
 
+    def _render(self, tempo: Tempo) -> None:
+        rendered = self.render(tempo)
+        rendered.seek(self.shared.position)
+        self.rendered = rendered
+
     def resume(self) -> None:
+        if self.rendered:
+            self.rendered.seek(self.shared.position)
         self.paused = False
 
     def pause(self) -> None:
@@ -86,6 +179,8 @@ class SoundTrack(Track, Generic[_Sounds], Protocol):
 
     def start(self, *, sounds: _Sounds | None = None) -> None:
         self.current_frame = 0
+        # Sound of previous tempo must not play
+        self.rendered = None
         self.stream.ready.wait()
         self.resume()
 
@@ -93,3 +188,7 @@ class SoundTrack(Track, Generic[_Sounds], Protocol):
             self.sounds = sounds
 
         self._preload_audiofiles()
+
+        if self.prerender:
+            # Rendered while configuring, so that it starts together with clock
+            self._render(self.shared.tempo)
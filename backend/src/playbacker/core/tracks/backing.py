@@ -0,0 +1,186 @@
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from threading import Event, Thread
+from typing import TYPE_CHECKING, cast
+
+import numpy
+
+from playbacker.core.audiofile import AudioArray
+from playbacker.core.ringbuffer import RingBuffer
+from playbacker.core.stream import Stream, resize_buffer
+from playbacker.core.track import StreamBuilder, Track
+
+if TYPE_CHECKING:
+    # Loaded only when file is streamed, commands that don't play audio skip them
+    import soundfile
+    import soxr
+
+# Frames of source file that are read at once
+_CHUNK_SIZE = 8192
+# Seconds to wait for file to fill its buffer before giving up on it
+_PRIME_TIMEOUT = 5
+
+
+@dataclass
+class StreamedFile:
+    """Audio file that is read and resampled ahead of playback on separate thread.
+
+    Only a couple of seconds are kept in memory, so long multichannel stems are fine.
+    """
+
+    path: Path
+    sample_rate: int = field(repr=False)
+    # Frame in target sample rate to start from
+    start_frame: int = 0
+    buffer_seconds: float = field(default=2, repr=False)
+    file: "soundfile.SoundFile" = field(init=False, repr=False)
+    buffer: RingBuffer = field(init=False, repr=False)
+    out: AudioArray = field(init=False, repr=False)
+    # Whether buffer is full or whole file is in it
+    primed: Event = field(default_factory=Event, init=False, repr=False)
+    stopped: bool = field(default=False, init=False)
+
+    def __post_init__(self) -> None:
+        import soundfile
+
+        # Open right away so that missing file is reported to caller
+        self.file = soundfile.SoundFile(self.path)
+        self.buffer = RingBuffer(
+            capacity=round(self.sample_rate * self.buffer_seconds),
+            channels=self.file.channels,
+        )
+        self.out = numpy.zeros((4096, self.file.channels))
+        Thread(target=self._prefetch, daemon=True).start()
+
+    def _get_resampler(self) -> "soxr.ResampleStream | None":
+        if self.file.samplerate == self.sample_rate:
+            return
+
+        import soxr
+
+        return soxr.ResampleStream(
+            self.file.samplerate, self.sample_rate, self.file.channels, dtype="float64"
+        )
+
+    def _write(self, chunk: AudioArray) -> None:
+        while not self.stopped:
+            chunk = chunk[self.buffer.write(chunk) :]
+            if not len(chunk):
+                return
+            self.primed.set()
+            time.sleep(self.buffer_seconds / 8)
+
+    def _prefetch(self) -> None:
+        try:
+            with self.file:
+                source_frame = self.start_frame * self.file.samplerate
+                self.file.seek(min(source_frame // self.sample_rate, self.file.frames))
+                resampler = self._get_resampler()
+
+                while not self.stopped:
+                    chunk = cast(
+                        AudioArray,
+                        self.file.read(  # pyright: ignore[reportUnknownMemberType]
+                            _CHUNK_SIZE, dtype="float64", always_2d=True
+                        ),
+                    )
+                    last = len(chunk) < _CHUNK_SIZE
+                    if resampler:
+                        chunk = cast(
+                            AudioArray,
+                            resampler.resample_chunk(  # pyright: ignore
+                                chunk, last=last
+                            ),
+                        )
+                    self._write(chunk)
+                    if last:
+                        break
+        finally:
+            self.buffer.close()
+            self.primed.set()
+
+    def read(self, frames: int) -> AudioArray | None:
+        """Copy next frames from buffer. Called from audio callback."""
+        self.out = resize_buffer(self.out, frames)
+        size = self.buffer.read_into(self.out[:frames])
+        return self.out[:size] if size else None
+
+    def stop(self) -> None:
+        self.stopped = True
+
+
+@dataclass
+class BackingTrack(Track):
+    """Plays song's own audio file (multitrack or guide) streamed from disk."""
+
+    stream_builder: StreamBuilder = field(repr=False)
+    stream: Stream = field(init=False, repr=False)
+    enabled: bool = field(default=True, init=False)
+    path: Path | None = field(default=None, init=False)
+    file: StreamedFile | None = field(default=None, init=False, repr=False)
+    # Underruns of files that were already closed
+    underruns: int = field(default=0, init=False)
+
+    def __post_init__(self) -> None:
+        self.stream = self.stream_builder(self.callback)
+
+    def callback(self, frames: int) -> AudioArray | None:
+        file = self.file
+        if self.paused or self.shared.configuring or not file:
+            return
+
+        # Keep reading while disabled to stay in sync with clock
+        data = file.read(frames)
+        return data if self.enabled else None
+
+    def count_underruns(self) -> int:
+        return self.underruns + (self.file.buffer.underruns if self.file else 0)
+
+    def _open(self) -> None:
+        import soundfile
+
+        if self.file:
+            self.file.stop()
+            self.underruns += self.file.buffer.underruns
+            self.file = None
+
+        if not self.path:
+            return
+
+        frame = 0
+        if self.shared.position:
+            seconds = self.shared.position * self.shared.tempo.lag
+            frame = round(seconds * self.stream.sample_rate)
+
+        try:
+            file = StreamedFile(
+                self.path, sample_rate=self.stream.sample_rate, start_frame=frame
+            )
+        except (soundfile.SoundFileError, OSError) as err:
+            # Metronome and countdown still play without this file
+            print(f"Failed to open {self.path}: {err}")
+            return
+        if not file.primed.wait(_PRIME_TIMEOUT):
+            # Slow disk or network share, better play without this file than hang
+            file.stop()
+            print(f"Failed to open {self.path}: timed out reading it")
+            return
+        self.file = file
+
+    def resume(self) -> None:
+        self._open()
+        self.paused = False
+
+    def pause(self) -> None:
+        self.paused = True
+
+    def destroy(self) -> None:
+        if self.file:
+            self.file.stop()
+        self.stream.destroy()
+
+    def start(self, path: Path | None) -> None:
+        self.path = path
+        self.stream.ready.wait()
+        self.resume()
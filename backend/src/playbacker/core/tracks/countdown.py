@@ -1,9 +1,15 @@
 from dataclasses import dataclass, field
+from functools import cache
 from typing import Literal, NamedTuple
 
 from playbacker.core.audiofile import AudioArray, AudioFile
-from playbacker.core.tempo import TimeSignature
-from playbacker.core.track import SoundTrack
+from playbacker.core.tempo import Tempo, TimeSignature
+from playbacker.core.track import (
+    RenderedSound,
+    SoundEvent,
+    SoundTrack,
+    render_sound_events,
+)
 
 
 class CountdownSounds(NamedTuple):
@@ -30,13 +36,44 @@ class CountdownTrack(SoundTrack[CountdownSounds]):
         }
 
     def get_sound(self) -> AudioArray | None:
-        for end, instruction in countdown_schemes[self.shared.tempo.time_signature]:
-            if self.shared.position < end:
-                return self.instruction_to_sound[instruction].data
+        pattern = compile_countdown_pattern(self.shared.tempo.time_signature)
+        if self.shared.position >= len(pattern):
+            return None
 
-            if self.shared.position == end:
-                self.current_frame = 0
-                return None
+        if instruction := pattern[self.shared.position]:
+            return self.instruction_to_sound[instruction].data
+
+        self.current_frame = 0
+
+    def render(self, tempo: Tempo) -> RenderedSound:
+        """Render whole countdown phrase."""
+        lag_frames = tempo.lag * self.stream.sample_rate
+        pattern = compile_countdown_pattern(tempo.time_signature)
+        events: list[SoundEvent] = []
+        start = 0
+
+        for position, instruction in enumerate(pattern):
+            if instruction is not None:
+                continue
+
+            offset = round(start * lag_frames)
+            events.append(
+                SoundEvent(
+                    offset=offset,
+                    data=self.instruction_to_sound[pattern[start]].data,
+                    limit=round(position * lag_frames) - offset,
+                )
+            )
+            start = position + 1
+
+        return RenderedSound(
+            data=render_sound_events(
+                events, round(len(pattern) * lag_frames), loop=False
+            ),
+            tempo=tempo,
+            sample_rate=self.stream.sample_rate,
+            loop=False,
+        )
 
 
 class _Entry(NamedTuple):
@@ -70,3 +107,20 @@ countdown_schemes: dict[TimeSignature, list[_Entry]] = {
         _Entry(end=23, instruction=4),
     ],
 }
+
+
+@cache
+def compile_countdown_pattern(
+    time_signature: TimeSignature,
+) -> tuple[_Instruction, ...]:
+    """Instructions for every position of countdown.
+
+    `None` is at the end of each entry: sound should be stopped there.
+    """
+    pattern: list[_Instruction] = []
+
+    for end, instruction in countdown_schemes[time_signature]:
+        pattern.extend(instruction for _ in range(len(pattern), end))
+        pattern.append(None)
+
+    return tuple(pattern)
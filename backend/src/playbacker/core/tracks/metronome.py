@@ -1,9 +1,16 @@
+import math
 from dataclasses import dataclass, field
+from functools import cache
 from typing import Literal, NamedTuple
 
 from playbacker.core.audiofile import AudioArray, AudioFile
 from playbacker.core.tempo import Duration, Tempo, TimeSignature
-from playbacker.core.track import SoundTrack
+from playbacker.core.track import (
+    RenderedSound,
+    SoundEvent,
+    SoundTrack,
+    render_sound_events,
+)
 
 
 class MetronomeSounds(NamedTuple):
@@ -36,6 +43,22 @@ class MetronomeTrack(SoundTrack[MetronomeSounds]):
     def tick(self) -> None:
         self.current_frame = 0
 
+    def render(self, tempo: Tempo) -> RenderedSound:
+        """Render one bar."""
+        lag_frames = tempo.lag * self.stream.sample_rate
+        bar = tempo.beats_per_bar * 4
+        events = (
+            SoundEvent(round(p * lag_frames), self.instruction_to_sound[i].data)
+            for p in range(bar)
+            if (i := get_instruction(tempo, p))
+        )
+        return RenderedSound(
+            data=render_sound_events(events, round(bar * lag_frames), loop=True),
+            tempo=tempo,
+            sample_rate=self.stream.sample_rate,
+            loop=True,
+        )
+
 
 class _Entry(NamedTuple):
     divider: int
@@ -80,7 +103,26 @@ metronome_schemes: dict[TimeSignature, dict[Duration, list[_Entry]]] = {
 }
 
 
+@cache
+def compile_metronome_pattern(
+    time_signature: TimeSignature, duration: Duration
+) -> tuple[_Instruction | None, ...]:
+    """Instructions for every position within the shortest repeating period."""
+    scheme = metronome_schemes[time_signature][duration]
+    period = math.lcm(*(entry.divider for entry in scheme))
+    pattern: list[_Instruction | None] = []
+
+    for position in range(period):
+        for divider, instruction in scheme:
+            if position % divider == 0:
+                pattern.append(instruction)
+                break
+        else:
+            pattern.append(None)
+
+    return tuple(pattern)
+
+
 def get_instruction(tempo: Tempo, position: int) -> _Instruction | None:
-    for divider, instruction in metronome_schemes[tempo.time_signature][tempo.duration]:
-        if position % divider == 0:
-            return instruction
+    pattern = compile_metronome_pattern(tempo.time_signature, tempo.duration)
+    return pattern[position % len(pattern)]
@@ -1,40 +1,141 @@
-import subprocess
+import io
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Any
 
 import yaml
+from pydantic import BaseModel, ValidationError
 
+from playbacker.config import SafeLoader, load_yaml
+from playbacker.core.audiofile import get_default_cache_dir
+from playbacker.core.filetag import combine_tags, get_content_tag
+from playbacker.core.formatting import format_yaml_file
 from playbacker.core.setlist import FileSetlist
-from playbacker.core.settings import load_settings
-from playbacker.core.song import load_songs
+from playbacker.core.settings import _FileSettings, load_settings
+from playbacker.core.song import _FileSongs, index_songs, load_songs
 
+# Bump when shape of cached results changes
+VALIDATION_CACHE_VERSION = 1
+# Starting worker processes costs more than parsing few files
+PARALLEL_MIN_FILES = 16
 
-def format_yaml_files(*files: str | Path):
-    subprocess.check_call(
-        ["npx", "prettier", "--write", *files],
-        stdout=subprocess.DEVNULL,
-    )
+
+@dataclass
+class ValidationCache:
+    """Results of validation for file contents seen before, keyed by content tag.
+
+    Only results for contents seen in the last run are saved, so cache doesn't
+    grow with history of edits.
+    """
+
+    path: Path
+    setlists: dict[str, list[str]] = field(default_factory=dict[str, list[str]])
+    formatted: set[str] = field(default_factory=set[str])
+    seen: set[str] = field(default_factory=set[str])
+
+    @classmethod
+    def load(cls, path: Path) -> "ValidationCache":
+        cache = cls(path)
+        try:
+            content: Any = json.loads(path.read_text())
+            if content["version"] == VALIDATION_CACHE_VERSION:
+                cache.setlists = dict(content["setlists"])
+                cache.formatted = set(content["formatted"])
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return cache
+
+    def save(self) -> None:
+        content = {
+            "version": VALIDATION_CACHE_VERSION,
+            "setlists": {k: v for k, v in self.setlists.items() if k in self.seen},
+            "formatted": sorted(self.formatted & self.seen),
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(content, f)
+        os.replace(tmp, self.path)
+
+
+def get_validation_cache_path(config_dir_path: Path) -> Path:
+    name = combine_tags([str(config_dir_path.resolve())])
+    return get_default_cache_dir() / "validation" / f"{name}.json"
+
+
+def _parse_setlist(path: Path, data: bytes) -> list[str]:
+    # Named stream, so that YAML errors point to the file
+    stream = io.BytesIO(data)
+    stream.name = str(path)
+    content = yaml.load(stream, Loader=SafeLoader)
+    try:
+        return FileSetlist.parse_obj(content).__root__
+    except ValidationError as err:
+        raise ValueError(f"Invalid setlist {path}\n{err}") from err
+
+
+def parse_setlists(paths: list[Path], cache: ValidationCache) -> dict[Path, list[str]]:
+    """Song names in setlists. Only contents that are not in cache are parsed."""
+    tags: dict[Path, str] = {}
+    missing: dict[str, tuple[Path, bytes]] = {}
+    for path in paths:
+        data = path.read_bytes()
+        tags[path] = tag = get_content_tag(data)
+        if tag not in cache.setlists:
+            missing[tag] = path, data
+
+    # Parsing is CPU-bound, threads would wait on the GIL
+    if len(missing) >= PARALLEL_MIN_FILES:
+        with ProcessPoolExecutor() as executor:
+            results = list(executor.map(_parse_setlist, *zip(*missing.values())))
+    else:
+        results = [_parse_setlist(path, data) for path, data in missing.values()]
+
+    cache.setlists.update(zip(missing, results))
+    cache.seen.update(tags.values())
+    return {path: cache.setlists[tag] for path, tag in tags.items()}
+
+
+def format_config_files(
+    config_file: Path, songs_file: Path, setlists_dir: Path, cache: ValidationCache
+):
+    """Format config files in place, return the ones that were changed.
+    Files that are known to be formatted are skipped.
+    """
+    files: list[tuple[Path, type[BaseModel]]] = [
+        (config_file, _FileSettings),
+        (songs_file, _FileSongs),
+        *((path, FileSetlist) for path in sorted(setlists_dir.glob("*.yaml"))),
+    ]
+    changed: list[Path] = []
+
+    for path, model in files:
+        tag = get_content_tag(path.read_bytes())
+        if tag not in cache.formatted and format_yaml_file(path, model):
+            changed.append(path)
+            tag = get_content_tag(path.read_bytes())
+        cache.formatted.add(tag)
+        cache.seen.add(tag)
+
+    return changed
 
 
 def validate_config_schema(config_file: Path):
-    with config_file.open() as f:
-        content = yaml.safe_load(f)
-    load_settings(content, "default")
+    load_yaml(config_file, load_settings, "default")
 
 
-def get_unknown_songs(songs_file: Path, setlists_dir: Path):
-    with songs_file.open() as f:
-        content = yaml.safe_load(f)
-    songs = [s.name.casefold() for s in load_songs(content)]
+def get_unknown_songs(songs_file: Path, setlists_dir: Path, cache: ValidationCache):
+    songs = index_songs(load_yaml(songs_file, load_songs))
+    setlists = parse_setlists(sorted(setlists_dir.glob("*.yaml")), cache)
     res: dict[Path, list[str]] = {}
 
-    for setlist_path in setlists_dir.glob("*.yaml"):
-        with setlist_path.open() as f:
-            content = yaml.safe_load(f)
-        cur_songs = FileSetlist(__root__=content).__root__
-
-        if cur_unknown_songs := list(
-            filter(lambda s: s.casefold() not in songs, cur_songs)
-        ):
+    for setlist_path, cur_songs in setlists.items():
+        if cur_unknown_songs := [s for s in cur_songs if s.casefold() not in songs]:
             res[setlist_path] = cur_unknown_songs
 
     return res
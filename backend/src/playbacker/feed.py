@@ -0,0 +1,164 @@
+import itertools
+import time
+from collections import deque
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from typing import Literal
+
+from pydantic import BaseModel, ValidationError
+
+from playbacker.broadcast import Changes
+from playbacker.core.setlist import (
+    NoSongInStorageError,
+    Setlist,
+    SetlistIndex,
+    load_setlist,
+)
+from playbacker.core.song import Song, SongIndex
+
+
+class SetlistPatch(BaseModel):
+    """Changes between two versions of setlist. Songs are identified by name."""
+
+    removed: list[str] = []
+    added: list[Song] = []
+    # Songs with same name but different tempo, artist or tracks
+    changed: list[Song] = []
+    # New order of song names if it changed
+    order: list[str] | None = None
+
+
+class SnapshotMessage(BaseModel):
+    type: Literal["snapshot"]
+    version: int
+    # None if setlist was removed or can't be loaded
+    setlist: Setlist | None
+
+
+class PatchMessage(BaseModel):
+    type: Literal["patch"]
+    # Version that patch applies to
+    base: int
+    version: int
+    patch: SetlistPatch
+
+
+class SetlistsMessage(BaseModel):
+    type: Literal["setlists"]
+
+
+def diff_setlists(old: Setlist, new: Setlist) -> SetlistPatch:
+    old_songs = {song.name: song for song in old.songs}
+    new_songs = {song.name: song for song in new.songs}
+    old_order = [song.name for song in old.songs]
+    new_order = [song.name for song in new.songs]
+
+    return SetlistPatch(
+        removed=[name for name in old_songs if name not in new_songs],
+        added=[song for name, song in new_songs.items() if name not in old_songs],
+        changed=[
+            song
+            for name, song in new_songs.items()
+            if name in old_songs and old_songs[name] != song
+        ],
+        order=new_order if new_order != old_order else None,
+    )
+
+
+@dataclass
+class VersionedSetlist:
+    version: int
+    setlist: Setlist | None
+    # Patches that led to recent versions, oldest first
+    history: deque[PatchMessage]
+
+    def snapshot(self) -> SnapshotMessage:
+        return SnapshotMessage(
+            type="snapshot", version=self.version, setlist=self.setlist
+        )
+
+
+@dataclass
+class SetlistFeed:
+    """Versions of watched setlists and patches between them.
+
+    Diffs are computed once per change, not per client. Only setlists that
+    clients asked for are tracked.
+    """
+
+    song_index: SongIndex
+    setlist_index: SetlistIndex
+    # Clients that are further behind get snapshot
+    max_history: int = 32
+    setlists: dict[str, VersionedSetlist] = field(
+        default_factory=dict[str, VersionedSetlist], init=False
+    )
+    # Versions are unique across restarts so clients never mistake stale
+    # setlist for current one. Milliseconds fit in JavaScript number
+    versions: Iterator[int] = field(
+        default_factory=lambda: itertools.count(time.time_ns() // 1_000_000),
+        init=False,
+    )
+
+    def _resolve(self, name: str) -> Setlist | None:
+        entry = self.setlist_index.get(name)
+        if not entry or entry.tag is None:
+            return None
+        try:
+            return load_setlist(
+                name=name, content=entry.content, songs=self.song_index.songs
+            )
+        except (NoSongInStorageError, ValidationError):
+            return None
+
+    def get(self, name: str) -> VersionedSetlist:
+        if name not in self.setlists:
+            self.setlists[name] = VersionedSetlist(
+                version=next(self.versions),
+                setlist=self._resolve(name),
+                history=deque(maxlen=self.max_history),
+            )
+        return self.setlists[name]
+
+    def update(self, changes: Changes) -> None:
+        """Bump versions of tracked setlists affected by changed paths."""
+        songs_changed = self.song_index.path in changes
+
+        for name, current in self.setlists.items():
+            path = self.setlist_index.get_path(name)
+            removed = path is None and current.setlist is not None
+            if not (songs_changed or removed or path in changes):
+                continue
+
+            setlist = self._resolve(name)
+            if setlist == current.setlist:
+                continue
+
+            base, current.version = current.version, next(self.versions)
+            if current.setlist and setlist:
+                patch = diff_setlists(current.setlist, setlist)
+                current.history.append(
+                    PatchMessage(
+                        type="patch", base=base, version=current.version, patch=patch
+                    )
+                )
+            else:
+                # Nothing to patch, clients need snapshot
+                current.history.clear()
+            current.setlist = setlist
+
+    def messages_since(
+        self, name: str, version: int | None
+    ) -> list[PatchMessage] | list[SnapshotMessage]:
+        """Patches that bring client from `version` to current one, or snapshot
+        if they aren't available.
+        """
+        current = self.get(name)
+        if version == current.version:
+            return []
+
+        history = list(current.history)
+        for idx, message in enumerate(history):
+            if message.base == version:
+                return history[idx:]
+        return [current.snapshot()]
@@ -1,22 +1,17 @@
 from pathlib import Path
 
 import typer
-import uvicorn
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from rich.table import Table
 
-from playbacker.app import get_app
 from playbacker.config import (
     Config,
     get_config_file_path,
     get_setlists_dir_path,
     get_songs_file_path,
+    read_yaml,
 )
-from playbacker.core.validate import (
-    format_yaml_files,
-    get_unknown_songs,
-    validate_config_schema,
-)
+
+# Commands import what they need when called: web server, audio and terminal
+# UI libraries take most of CLI startup time
 
 default_config_dir_path = Path("~/.config/playbacker").expanduser()
 config_opt = typer.Option(
@@ -26,6 +21,8 @@ default_device = "default"
 
 
 def default_app():
+    from playbacker.app import get_app
+
     default_config = Config(
         config_dir_path=default_config_dir_path, device=default_device
     )
@@ -33,6 +30,8 @@ def default_app():
 
 
 cli = typer.Typer(add_completion=False)
+cache_cli = typer.Typer(help="Manage cache of decoded and resampled sounds.")
+cli.add_typer(cache_cli, name="cache")
 
 
 @cli.callback(invoke_without_command=True)
@@ -45,6 +44,10 @@ def main(
     if ctx.invoked_subcommand is not None:
         return
 
+    import uvicorn
+
+    from playbacker.app import get_app
+
     if reload:
         if device != default_device:
             print(f"Setting device to {default_device!r} since you passed --reload.")
@@ -65,27 +68,77 @@ def main(
 
 @cli.command()
 def validate(config: Path = config_opt):
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    from rich.table import Table
+
+    from playbacker.core.validate import (
+        ValidationCache,
+        format_config_files,
+        get_unknown_songs,
+        get_validation_cache_path,
+        validate_config_schema,
+    )
+
     config_file = get_config_file_path(config)
     songs_file = get_songs_file_path(config)
     setlists_dir = get_setlists_dir_path(config)
+    cache = ValidationCache.load(get_validation_cache_path(config))
+
+    # Keep results for files that were parsed even if validation fails
+    try:
+        with Progress(
+            SpinnerColumn(), TextColumn("[progress.description]{task.description}")
+        ) as progress:
+            progress.add_task(description="Checking unknown songs...")
+            unknown_songs = get_unknown_songs(
+                songs_file=songs_file, setlists_dir=setlists_dir, cache=cache
+            )
+            if unknown_songs:
+                table = Table(show_header=False, show_lines=True)
+                for setlist_path, songs in unknown_songs.items():
+                    songs_str = ",\n".join(f'"{song}"' for song in songs)
+                    table.add_row(str(setlist_path), songs_str)
+                progress.stop()
+                progress.print("There are unknown songs in setlists:", table)
+
+            progress.add_task(description="Validating config schema...")
+            validate_config_schema(config_file)
+
+            progress.add_task(description="Formatting...")
+            for path in format_config_files(
+                config_file, songs_file, setlists_dir, cache
+            ):
+                progress.print(f"Formatted {path}")
+    finally:
+        try:
+            cache.save()
+        except OSError as err:
+            print(f"Failed to save validation cache: {err}")
+
+
+@cache_cli.command("warm")
+def cache_warm(config: Path = config_opt):
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+
+    from playbacker.core.audiofile import preload_audiofiles
+    from playbacker.core.settings import get_all_audiofiles
+
+    content = read_yaml(get_config_file_path(config))
 
     with Progress(
         SpinnerColumn(), TextColumn("[progress.description]{task.description}")
     ) as progress:
-        progress.add_task(description="Checking unknown songs...")
-        unknown_songs = get_unknown_songs(
-            songs_file=songs_file, setlists_dir=setlists_dir
-        )
-        if unknown_songs:
-            table = Table(show_header=False, show_lines=True)
-            for setlist_path, songs in unknown_songs.items():
-                songs_str = ",\n".join(f'"{song}"' for song in songs)
-                table.add_row(str(setlist_path), songs_str)
-            progress.stop()
-            progress.print("There are unknown songs in setlists:", table)
-
-        progress.add_task(description="Validating config schema...")
-        validate_config_schema(config_file)
-
-        progress.add_task(description="Formatting...")
-        format_yaml_files(config_file, songs_file, f"{setlists_dir}/*.yaml")
+        progress.add_task(description="Caching sounds...")
+        for file, elapsed in preload_audiofiles(get_all_audiofiles(content)):
+            progress.print(
+                f"Cached {file.path} at {file.sample_rate} Hz"
+                + f" in {elapsed * 1000:.1f} ms"
+            )
+
+
+@cache_cli.command("clear")
+def cache_clear(config: Path = config_opt):
+    from playbacker.core.settings import load_audio_cache
+
+    content = read_yaml(get_config_file_path(config))
+    load_audio_cache(content).clear()
@@ -0,0 +1,211 @@
+import math
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from time import perf_counter
+
+from starlite import Controller, MiddlewareProtocol
+from starlite.types import ASGIApp, Receive, Scope, Send
+
+from playbacker.config import parse_durations
+from playbacker.core.clock import Clock
+from playbacker.core.histogram import Histogram
+from playbacker.core.player import Player
+
+Labels = dict[str, str]
+# Name suffix, labels and value
+Sample = tuple[str, Labels, float]
+
+
+def get_request_latency_histogram() -> Histogram:
+    """Handler latency in seconds."""
+    return Histogram(
+        bounds=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+    )
+
+
+@dataclass
+class ServerMetrics:
+    """Web server state that is exported along with playback metrics."""
+
+    request_latency: dict[str, Histogram] = field(default_factory=dict[str, Histogram])
+    watchers: int = 0
+    # /watch websockets closed because they didn't keep up with changes
+    dropped_watchers: int = 0
+
+    def record_request(self, handler: str, elapsed: float) -> None:
+        if handler not in self.request_latency:
+            self.request_latency[handler] = get_request_latency_histogram()
+        self.request_latency[handler].record(elapsed)
+
+
+class RequestTimingMiddleware(MiddlewareProtocol):
+    """Record latency of controller handlers."""
+
+    def __init__(self, app: ASGIApp, metrics: ServerMetrics) -> None:
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        handler = scope["route_handler"]
+        if scope["type"] != "http" or not isinstance(handler.owner, Controller):
+            await self.app(scope, receive, send)
+            return
+
+        started = perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.metrics.record_request(handler.handler_name, perf_counter() - started)
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return str(value)
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    return f"{{{pairs}}}"
+
+
+def format_metric(
+    name: str, type: str, help: str, samples: Iterable[Sample]
+) -> list[str]:
+    """Metric in Prometheus text exposition format."""
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {type}"]
+    for suffix, labels, value in samples:
+        lines.append(f"{name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+    return lines
+
+
+def histogram_samples(
+    histogram: Histogram, labels: Labels | None = None
+) -> list[Sample]:
+    labels = labels or {}
+    samples: list[Sample] = []
+    cumulative = 0
+
+    for bound, count in histogram.buckets():
+        cumulative += count
+        le = _format_value(bound)
+        samples.append(("_bucket", {**labels, "le": le}, cumulative))
+
+    # Count is taken from buckets: histogram may be updated while reading
+    samples.append(("_sum", labels, histogram.sum))
+    samples.append(("_count", labels, cumulative))
+    return samples
+
+
+def render_metrics(player: Player, server: ServerMetrics) -> str:
+    playback = player.playback
+    stats = playback.mixer.stats
+    tracks = playback.tracks
+    sounds = playback.settings.sounds
+    files = (*sounds.metronome, *sounds.countdown)
+    cache = next((file.cache for file in files if file.cache), None)
+    lines: list[str] = []
+
+    def add(name: str, type: str, help: str, samples: Iterable[Sample]) -> None:
+        lines.extend(format_metric(f"playbacker_{name}", type, help, samples))
+
+    if isinstance(playback.clock, Clock):
+        add(
+            "clock_tick_lateness_seconds",
+            "histogram",
+            "Delay of clock ticks relative to schedule.",
+            histogram_samples(playback.clock.lateness),
+        )
+
+    add(
+        "audio_callback_duration_seconds",
+        "histogram",
+        "Wall time of audio callback.",
+        histogram_samples(stats.duration),
+    )
+    add(
+        "audio_callback_load_ratio",
+        "histogram",
+        "Wall time of audio callback relative to duration of produced audio.",
+        histogram_samples(stats.load),
+    )
+    add(
+        "output_underflows_total",
+        "counter",
+        "Audio callbacks with output underflow flag.",
+        [("", {}, stats.output_underflows)],
+    )
+    add(
+        "priming_outputs_total",
+        "counter",
+        "Audio callbacks with priming output flag.",
+        [("", {}, stats.priming_outputs)],
+    )
+    add(
+        "backing_track_underruns_total",
+        "counter",
+        "Reads of streamed song files that ran out of prefetched audio.",
+        [
+            ("", {"track": "multitrack"}, tracks.multitrack.count_underruns()),
+            ("", {"track": "guide"}, tracks.guide.count_underruns()),
+        ],
+    )
+
+    if cache:
+        add(
+            "audio_cache_hits_total",
+            "counter",
+            "Sounds loaded from disk cache.",
+            [("", {}, cache.hits)],
+        )
+        add(
+            "audio_cache_misses_total",
+            "counter",
+            "Sounds that had to be decoded.",
+            [("", {}, cache.misses)],
+        )
+
+    add(
+        "decoded_audio_bytes",
+        "gauge",
+        "Size of sounds that are loaded in memory.",
+        [("", {}, sum(file.data.nbytes for file in files if file.loaded))],
+    )
+    add(
+        "gc_pause_seconds",
+        "histogram",
+        "Duration of garbage collections.",
+        histogram_samples(player.memory.pauses),
+    )
+    add(
+        "yaml_parse_seconds",
+        "histogram",
+        "Time spent parsing config, songs and setlist files.",
+        histogram_samples(parse_durations),
+    )
+    add(
+        "http_request_duration_seconds",
+        "histogram",
+        "Latency of API handlers.",
+        (
+            sample
+            for handler, histogram in sorted(server.request_latency.items())
+            for sample in histogram_samples(histogram, {"handler": handler})
+        ),
+    )
+    add(
+        "watch_connections",
+        "gauge",
+        "Open /watch websockets.",
+        [("", {}, server.watchers)],
+    )
+    add(
+        "watch_dropped_total",
+        "counter",
+        "/watch websockets closed for falling behind.",
+        [("", {}, server.dropped_watchers)],
+    )
+
+    return "\n".join(lines) + "\n"
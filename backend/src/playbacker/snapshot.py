@@ -0,0 +1,117 @@
+import os
+import pickle
+import sys
+import tempfile
+from dataclasses import dataclass
+from functools import cache
+from pathlib import Path
+from typing import Any
+
+from playbacker.config import (
+    Config,
+    get_config_file_path,
+    get_setlists_dir_path,
+    get_songs_file_path,
+    read_yaml,
+)
+from playbacker.core.audiofile import get_default_cache_dir
+from playbacker.core.filetag import combine_tags, get_content_tag, get_file_tag
+from playbacker.core.setlist import SetlistIndex
+from playbacker.core.song import SongIndex
+
+_MAGIC = b"playbacker-snapshot"
+
+
+@dataclass
+class Snapshot:
+    """Everything server needs from config directory.
+
+    Only what is derived from files: settings depend on connected device, so
+    they are loaded from `config` on every start.
+    """
+
+    config: Any
+    song_index: SongIndex
+    setlist_index: SetlistIndex
+
+
+def get_snapshot_path(config_dir_path: Path) -> Path:
+    name = combine_tags([str(config_dir_path.resolve())])
+    return get_default_cache_dir() / "snapshots" / f"{name}.pickle"
+
+
+@cache
+def get_code_tag() -> str:
+    """Changes with code of the package, pickled classes may differ then."""
+    package = Path(__file__).parent
+    return combine_tags(
+        f"{path.relative_to(package)}:{get_content_tag(path.read_bytes())}"
+        for path in sorted(package.rglob("*.py"))
+    )
+
+
+def get_fingerprint(config: Config) -> str:
+    """Changes when any source file, code or Python version changes."""
+    setlists_dir = get_setlists_dir_path(config.config_dir_path)
+    setlists = sorted(setlists_dir.glob("*.yaml"))
+    return combine_tags(
+        [
+            sys.version,
+            get_code_tag(),
+            get_file_tag(get_config_file_path(config.config_dir_path)),
+            get_file_tag(get_songs_file_path(config.config_dir_path)),
+            *(f"{path.name}:{get_file_tag(path)}" for path in setlists),
+        ]
+    )
+
+
+def _get_header(fingerprint: str) -> bytes:
+    return b"%s %s\n" % (_MAGIC, fingerprint.encode())
+
+
+def build_snapshot(config: Config) -> Snapshot:
+    song_index = SongIndex(get_songs_file_path(config.config_dir_path))
+    song_index.refresh()
+    setlist_index = SetlistIndex(get_setlists_dir_path(config.config_dir_path))
+    setlist_index.refresh()
+    content = read_yaml(get_config_file_path(config.config_dir_path))
+    return Snapshot(content, song_index, setlist_index)
+
+
+def load_snapshot(path: Path, fingerprint: str) -> Snapshot | None:
+    """Snapshot if it exists and was made from the same sources."""
+    try:
+        with path.open("rb") as f:
+            if f.readline() != _get_header(fingerprint):
+                return None
+            snapshot = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+        return None
+    return snapshot if isinstance(snapshot, Snapshot) else None
+
+
+def save_snapshot(path: Path, fingerprint: str, snapshot: Snapshot) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Write to temporary file first so that readers never see partial snapshot
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(_get_header(fingerprint))
+        pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+def get_snapshot(config: Config) -> Snapshot:
+    """Load snapshot of config directory, or build and save it if sources changed."""
+    path = get_snapshot_path(config.config_dir_path)
+    fingerprint = get_fingerprint(config)
+
+    if snapshot := load_snapshot(path, fingerprint):
+        return snapshot
+
+    snapshot = build_snapshot(config)
+    try:
+        save_snapshot(path, fingerprint, snapshot)
+    except OSError as err:
+        print(f"Failed to save config snapshot: {err}")
+    return snapshot
@@ -0,0 +1,52 @@
+import itertools
+import time
+import tracemalloc
+from typing import Any, cast
+
+import numpy
+
+from playbacker.core.stream import SounddeviceMixer
+
+FRAMES = 512
+CHANNEL_LIMIT = 16
+PERIODS = 10_000
+
+
+class Mixer(SounddeviceMixer):
+    def __post_init__(self) -> None:
+        self.buffer = numpy.zeros((FRAMES, self.channel_limit))
+        self.scratch = numpy.zeros_like(self.buffer)
+
+
+def main():
+    mixer = Mixer(sample_rate=48000, channel_limit=CHANNEL_LIMIT, device_name=None)
+    data = numpy.random.default_rng().random((FRAMES, 2))
+    mixer.add_input(lambda _: data, channel_map=[1])
+    mixer.add_input(lambda _: data, channel_map=[2])
+    mixer.add_input(lambda _: data, channel_map=list(range(3, CHANNEL_LIMIT + 1)))
+    outdata = numpy.zeros((FRAMES, CHANNEL_LIMIT), dtype="float32")
+
+    def callback():
+        mixer._callback(outdata, FRAMES, ..., cast(Any, ...))
+
+    callback()
+    start = time.perf_counter()
+    for _ in itertools.repeat(None, PERIODS):
+        callback()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    for _ in itertools.repeat(None, PERIODS):
+        callback()
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    budget = FRAMES / mixer.sample_rate
+    print(f"{elapsed / PERIODS * 1e6:.1f} µs per period ({budget * 1e3:.1f} ms budget)")
+    print(
+        f"Retained after {PERIODS} periods: {after - before} B, peak: {peak - before} B"
+    )
+
+
+main()
@@ -0,0 +1,20 @@
+import sys
+import time
+from typing import cast
+
+from playbacker.core.clock import Clock, SchedulerName, schedulers
+
+TICKS = 200
+
+
+def measure(name: SchedulerName):
+    clock = Clock(callback=lambda: None, scheduler=schedulers[name]())
+    clock.lag = 60 / 130 / 4
+    clock.start()
+    time.sleep(clock.lag * TICKS)
+    clock.pause()
+    print(f"{name}:\n{clock.lateness}\n")
+
+
+for name in sys.argv[1:] or schedulers:
+    measure(cast(SchedulerName, name))
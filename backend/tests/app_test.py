@@ -0,0 +1,127 @@
+import asyncio
+from pathlib import Path
+from typing import Any
+from unittest.mock import AsyncMock, Mock
+
+import numpy
+import pytest
+import sounddevice
+import soundfile
+import yaml
+from starlite import NotFoundException, Starlite
+from starlite.exceptions import WebSocketDisconnect
+
+from playbacker.app import get_app, watch_route
+from playbacker.broadcast import Broadcaster
+from playbacker.config import Config
+from playbacker.core.setlist import SetlistIndex
+from playbacker.metrics import ServerMetrics
+
+
+@pytest.fixture
+def config(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Config:
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.setattr(
+        sounddevice,
+        "query_devices",
+        lambda device, kind: {"max_output_channels": 2},  # pyright: ignore
+    )
+    monkeypatch.setattr(sounddevice, "OutputStream", Mock())
+
+    sound = str(tmp_path / "a.wav")
+    soundfile.write(sound, numpy.zeros((100, 1)), 44100)
+    content: dict[str, Any] = {
+        "devices": [
+            {
+                "name": None,
+                "pretty_name": "default",
+                "sample_rate": 44100,
+                "channel_map": {"metronome": [1], "guide": [2], "multitrack": [1]},
+            }
+        ],
+        "sounds": {
+            "metronome": {"accent": sound, "1/4": sound, "1/8": sound, "1/16": sound},
+            "countdown": {f"count_{i}": sound for i in range(1, 5)},
+        },
+    }
+    (tmp_path / "config.yaml").write_text(yaml.dump(content))
+    song = {"tempo": {"bpm": 120, "time_signature": "4/4", "duration": "1/4"}}
+    (tmp_path / "songs.yaml").write_text(yaml.dump({"A": song}))
+    (tmp_path / "setlists").mkdir()
+    (tmp_path / "setlists" / "evening.yaml").write_text("- a")
+    return Config(config_dir_path=tmp_path, device="default")
+
+
+def run_lifespan(app: Starlite) -> tuple[list[str], int]:
+    """ASGI lifespan messages sent by app and number of tasks it started."""
+    sent: list[str] = []
+    tasks = 0
+
+    async def main():
+        events = iter(("lifespan.startup", "lifespan.shutdown"))
+
+        async def receive() -> Any:
+            nonlocal tasks
+            if sent:
+                tasks = len(asyncio.all_tasks()) - 1
+            return {"type": next(events)}
+
+        async def send(message: Any) -> None:
+            sent.append(message["type"])
+
+        scope: Any = {"type": "lifespan"}
+        await app(scope, receive, send)
+
+    asyncio.run(main())
+    return sent, tasks
+
+
+def test_startup_hooks_run_on_event_loop(config: Config):
+    sent, tasks = run_lifespan(get_app(config))
+    assert sent == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
+    assert tasks == 1
+
+
+def test_device_is_queried_on_every_start(
+    config: Config, monkeypatch: pytest.MonkeyPatch
+):
+    run_lifespan(get_app(config))
+    # Snapshot is reused, but now there's device with fewer outputs
+    monkeypatch.setattr(
+        sounddevice,
+        "query_devices",
+        lambda device, kind: {"max_output_channels": 1},  # pyright: ignore
+    )
+    with pytest.raises(RuntimeError, match="has only 1 outputs"):
+        get_app(config)
+
+
+@pytest.mark.parametrize("setlist", ("Evening", "Unknown"))
+def test_watch_counts_watchers(config: Config, setlist: str):
+    setlist_index = SetlistIndex(config.config_dir_path / "setlists")
+    setlist_index.refresh()
+    socket = AsyncMock()
+    socket.receive_text.side_effect = WebSocketDisconnect(detail="")
+    feed = Mock()
+    feed.messages_since.return_value = []
+    broadcaster = Broadcaster()
+    server_metrics = ServerMetrics()
+
+    async def main():
+        await watch_route.fn.value(  # pyright: ignore[reportUnknownMemberType]
+            socket=socket,
+            current_setlist=setlist,
+            setlist_index=setlist_index,
+            feed=feed,
+            broadcaster=broadcaster,
+            server_metrics=server_metrics,
+        )
+
+    if setlist == "Unknown":
+        with pytest.raises(NotFoundException):
+            asyncio.run(main())
+    else:
+        asyncio.run(main())
+
+    assert server_metrics.watchers == 0
+    assert not broadcaster.subscriptions
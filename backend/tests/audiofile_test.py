@@ -1,12 +1,19 @@
+import os
 from pathlib import Path
 from typing import Any
 from unittest.mock import Mock
 
+import numpy
 import pytest
 import soundfile
 import soxr
 
-from playbacker.core.audiofile import AudioFile
+from playbacker.core.audiofile import (
+    AudioCache,
+    AudioFile,
+    get_default_cache_dir,
+    preload_audiofiles,
+)
 
 
 @pytest.fixture
@@ -46,3 +53,127 @@ def test_audiofile_data_cached(audiofile: AudioFile, monkeypatch: pytest.MonkeyP
     for _ in range(3):
         audiofile.data
     mock.assert_called_once_with(audiofile.path)
+
+
+def test_get_default_cache_dir(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", "/xdg")
+    assert get_default_cache_dir() == Path("/xdg/playbacker")
+
+    monkeypatch.delenv("XDG_CACHE_HOME")
+    assert get_default_cache_dir() == Path("~/.cache/playbacker").expanduser()
+
+
+@pytest.fixture
+def cache(tmp_path: Path):
+    return AudioCache(directory=tmp_path / "cache", max_size=10_000)
+
+
+@pytest.fixture
+def source(tmp_path: Path):
+    path = tmp_path / "sound.wav"
+    path.write_bytes(b"sound")
+    return path
+
+
+def get_data(frames: int = 10) -> numpy.ndarray[Any, Any]:
+    return numpy.ones((frames, 2))
+
+
+def test_cache_miss(cache: AudioCache, source: Path):
+    assert cache.load(source, 44100) is None
+    assert cache.misses == 1
+
+
+def test_cache_store_load(cache: AudioCache, source: Path):
+    cache.store(source, 44100, get_data())
+    result = cache.load(source, 44100)
+
+    assert type(result) == numpy.ndarray
+    assert (result == get_data()).all()
+    assert cache.load(source, 48000) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_cache_key_changes_with_source(cache: AudioCache, source: Path):
+    before = cache.get_entry_path(source, 44100)
+    source.write_bytes(b"another sound")
+    assert cache.get_entry_path(source, 44100) != before
+
+
+def test_cache_evicts_least_recently_used(
+    cache: AudioCache, source: Path, tmp_path: Path
+):
+    cache.max_size = 100_000
+    sources = [source, tmp_path / "2.wav", tmp_path / "3.wav"]
+    for idx, path in enumerate(sources):
+        path.write_bytes(b"sound")
+        cache.store(path, 44100, get_data(frames=400))
+        os.utime(cache.get_entry_path(path, 44100), (idx, idx))
+
+    cache.load(sources[0], 44100)  # Mark as used
+    cache.max_size = 15_000
+    cache.evict()
+
+    assert cache.load(sources[0], 44100) is not None
+    assert cache.load(sources[1], 44100) is None
+    assert cache.load(sources[2], 44100) is not None
+
+
+def test_cache_evict_skips_removed_entries(
+    cache: AudioCache, source: Path, monkeypatch: pytest.MonkeyPatch
+):
+    cache.store(source, 44100, get_data())
+    entries = [cache.directory / "removed.npy", *cache.get_entries()]
+    monkeypatch.setattr(cache, "get_entries", lambda: entries)
+    cache.max_size = 0
+    cache.evict()
+    assert not any(path.exists() for path in entries)
+
+
+def test_cache_store_failure(
+    cache: AudioCache, source: Path, monkeypatch: pytest.MonkeyPatch
+):
+    def save(file: Any, data: Any):
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(numpy, "save", save)
+    monkeypatch.setattr(soundfile, "read", Mock(return_value=(get_data(), 44100)))
+
+    assert (AudioFile(source, 44100, cache).data == get_data()).all()
+    assert list(cache.directory.iterdir()) == []
+
+
+def test_cache_clear(cache: AudioCache, source: Path):
+    cache.clear()
+    cache.store(source, 44100, get_data())
+    cache.clear()
+    assert cache.get_entries() == []
+
+
+def test_audiofile_data_stores_to_cache(
+    cache: AudioCache, source: Path, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(soundfile, "read", Mock(return_value=(get_data(), 44100)))
+    assert (AudioFile(source, 44100, cache).data == get_data()).all()
+    assert (cache.load(source, 44100) == get_data()).all()
+
+
+def test_audiofile_data_loads_from_cache(
+    cache: AudioCache, source: Path, monkeypatch: pytest.MonkeyPatch
+):
+    cache.store(source, 44100, get_data())
+    mock = Mock()
+    monkeypatch.setattr(soundfile, "read", mock)
+
+    assert (AudioFile(source, 44100, cache).data == get_data()).all()
+    mock.assert_not_called()
+
+
+def test_preload_audiofiles(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(soundfile, "read", Mock(return_value=(get_data(), 44100)))
+    files = [AudioFile(Path(str(idx)), 44100) for idx in range(3)]
+    result = preload_audiofiles(files)
+
+    assert [file for file, _ in result] == files
+    assert all(elapsed >= 0 for _, elapsed in result)
+    assert all("data" in vars(file) for file in files)
@@ -0,0 +1,38 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from playbacker.broadcast import Broadcaster, SubscriptionDropped
+
+
+def test_publish_to_every_subscriber():
+    async def main():
+        broadcaster = Broadcaster()
+        first, second = broadcaster.subscribe(), broadcaster.subscribe()
+        broadcaster.publish(frozenset({Path("a.yaml")}))
+
+        assert await first.get() == {Path("a.yaml")}
+        assert await second.get() == {Path("a.yaml")}
+
+        broadcaster.unsubscribe(second)
+        broadcaster.publish(frozenset())
+        assert second.queue.empty()
+
+    asyncio.run(main())
+
+
+def test_slow_subscriber_is_dropped():
+    async def main():
+        broadcaster = Broadcaster(max_queue_size=2)
+        slow, fast = broadcaster.subscribe(), broadcaster.subscribe()
+
+        for _ in range(3):
+            broadcaster.publish(frozenset())
+            await fast.get()
+
+        assert broadcaster.subscriptions == {fast}
+        with pytest.raises(SubscriptionDropped):
+            await slow.get()
+
+    asyncio.run(main())
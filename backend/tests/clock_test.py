@@ -1,12 +1,21 @@
+import math
+import sys
 import time
 from dataclasses import dataclass
+from threading import get_ident
 from types import SimpleNamespace
 from typing import Any, cast
 from unittest.mock import Mock
 
 import pytest
 
-from playbacker.core.clock import Clock
+from playbacker.core.clock import (
+    Clock,
+    DeadlineScheduler,
+    FrameClock,
+    HybridScheduler,
+    SleepScheduler,
+)
 
 
 @pytest.fixture
@@ -71,6 +80,45 @@ def test_sleep_zero(clock: Clock, monkeypatch: pytest.MonkeyPatch):
     mock.assert_called_once_with(0)
 
 
+def test_clock_default_scheduler(clock: Clock):
+    assert type(clock.scheduler) == SleepScheduler
+
+
+def test_hybrid_scheduler(monkeypatch: pytest.MonkeyPatch):
+    now = iter((0.0, 0.0985, 0.099, 0.0995, 0.1))
+    sleep_mock = Mock()
+    monkeypatch.setattr(time, "monotonic", lambda: next(now))
+    monkeypatch.setattr(time, "sleep", sleep_mock)
+
+    HybridScheduler(spin_for=0.002).wait_until(0.1)
+    assert sleep_mock.call_args_list[0].args == (0.098,)
+    assert sleep_mock.call_args_list[1:] == [((0,),)] * 3
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="Linux only")
+def test_deadline_scheduler():
+    deadline = time.monotonic() + 0.005
+    DeadlineScheduler().wait_until(deadline)
+    assert time.monotonic() >= deadline
+
+
+@pytest.mark.skipif(sys.platform.startswith("linux"), reason="Not Linux")
+def test_deadline_scheduler_not_linux():  # pragma: no cover
+    with pytest.raises(RuntimeError):
+        DeadlineScheduler()
+
+
+def test_clock_tick_records_lateness(clock: Clock, monkeypatch: pytest.MonkeyPatch):
+    clock._sleep = Mock()
+    clock.lag = 1
+    clock.previous_time = 0
+    monkeypatch.setattr(time, "monotonic", lambda: 1.0003)
+
+    clock._tick()
+    assert clock.lateness.count == 1
+    assert round(clock.lateness.max, 4) == 0.0003
+
+
 def test_clock_tick():
     callback = Mock()
     clock = Clock(callback)
@@ -118,3 +166,52 @@ def test_clock_run():
     t.start(clock)
     t.pause(clock)
     print(t)
+
+
+def test_clock_prepares_thread():
+    thread_ids: list[int] = []
+    clock = Clock(lambda: None, prepare_thread=lambda: thread_ids.append(get_ident()))
+    time.sleep(0.01)
+
+    assert thread_ids == [clock.thread.ident]
+
+
+@pytest.fixture
+def frame_clock():
+    clock = FrameClock(Mock(), sample_rate=100)
+    clock.lag = 0.105  # 10.5 frames
+    return clock
+
+
+def test_frame_clock_not_started(frame_clock: FrameClock):
+    assert frame_clock.advance(512) == 512
+    assert frame_clock.frame == 0
+    cast(Mock, frame_clock.callback).assert_not_called()
+
+
+def test_frame_clock_start_pause(frame_clock: FrameClock):
+    frame_clock.frame = 100
+    frame_clock.start()
+    assert frame_clock.started
+    assert frame_clock.frame == 0
+    assert frame_clock.next_tick_frame == 10.5
+
+    frame_clock.pause()
+    assert not frame_clock.started
+
+
+def test_frame_clock_ticks_on_exact_frames(frame_clock: FrameClock):
+    ticks: list[int] = []
+    frame_clock.callback = lambda: ticks.append(frame_clock.frame)
+    frame_clock.start()
+
+    for _ in range(100):
+        offset = 0
+        while offset < 16:
+            offset += frame_clock.advance(16 - offset)
+        assert offset == 16
+
+    assert frame_clock.frame == 1600
+    # No drift even though lag isn't whole number of frames
+    assert ticks == [math.ceil(10.5 * n) for n in range(1, len(ticks) + 1)]
+    assert len(ticks) == 1600 // 10.5
@@ -0,0 +1,42 @@
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+from playbacker.config import SafeLoader, load_yaml, parse_durations, read_yaml
+
+
+def test_libyaml_loader_is_used():
+    if yaml.__with_libyaml__:
+        assert SafeLoader is yaml.CSafeLoader
+
+
+def test_read_yaml_is_memoized(tmp_path: Path):
+    path = tmp_path / "a.yaml"
+    path.write_text("a: 1")
+    count = parse_durations.count
+
+    content = read_yaml(path)
+    assert content == {"a": 1}
+    assert read_yaml(path) is content
+    assert parse_durations.count == count + 1
+
+    path.write_text("a: 10")
+    assert read_yaml(path) == {"a": 10}
+    assert parse_durations.count == count + 2
+
+
+def test_load_yaml_memoizes_converted_content(tmp_path: Path):
+    path = tmp_path / "a.yaml"
+    path.write_text("[1, 2]")
+
+    calls: list[int] = []
+
+    def convert(content: Any, multiplier: int) -> list[int]:
+        calls.append(multiplier)
+        return [value * multiplier for value in content]
+
+    assert load_yaml(path, convert, 2) == [2, 4]
+    assert load_yaml(path, convert, 2) == [2, 4]
+    assert load_yaml(path, convert, 3) == [3, 6]
+    assert calls == [2, 3]
@@ -0,0 +1,99 @@
+from pathlib import Path
+
+import pytest
+import yaml
+
+from playbacker.core.setlist import Setlist, SetlistIndex
+from playbacker.core.song import Song, SongIndex
+from playbacker.core.tempo import Tempo
+from playbacker.feed import PatchMessage, SetlistFeed, SnapshotMessage, diff_setlists
+
+
+def test_diff_setlists(tempo: Tempo):
+    a, b, c = (Song(name=n, artist=None, tempo=tempo) for n in "abc")
+    changed_b = Song(name="b", artist="me", tempo=tempo)
+    old = Setlist(name="", songs=[a, b])
+    new = Setlist(name="", songs=[c, changed_b])
+
+    patch = diff_setlists(old, new)
+    assert patch.removed == ["a"]
+    assert patch.added == [c]
+    assert patch.changed == [changed_b]
+    assert patch.order == ["c", "b"]
+
+    assert diff_setlists(old, old).order is None
+
+
+def write_songs(path: Path, tempos: dict[str, float]):
+    content = {
+        name: {"tempo": {"bpm": bpm, "time_signature": "4/4", "duration": "1/4"}}
+        for name, bpm in tempos.items()
+    }
+    path.write_text(yaml.dump(content))
+
+
+@pytest.fixture
+def feed(tmp_path: Path):
+    write_songs(tmp_path / "songs.yaml", {"a": 100, "b": 120})
+    (tmp_path / "setlists").mkdir()
+    (tmp_path / "setlists" / "evening.yaml").write_text("- a\n- b")
+
+    song_index = SongIndex(tmp_path / "songs.yaml")
+    song_index.refresh()
+    setlist_index = SetlistIndex(tmp_path / "setlists")
+    setlist_index.refresh()
+    return SetlistFeed(song_index, setlist_index)
+
+
+def test_feed_snapshot_on_first_request(feed: SetlistFeed):
+    (message,) = feed.messages_since("Evening", None)
+    assert isinstance(message, SnapshotMessage)
+    assert message.setlist and [s.name for s in message.setlist.songs] == ["a", "b"]
+    assert feed.messages_since("Evening", message.version) == []
+
+
+def test_feed_patches_after_changes(feed: SetlistFeed):
+    first = feed.get("Evening").version
+    path = feed.setlist_index.directory / "evening.yaml"
+
+    path.write_text("- b\n- a\n")
+    feed.setlist_index.update(path)
+    feed.update(frozenset({path}))
+
+    write_songs(feed.song_index.path, {"a": 100, "b": 130.5})
+    feed.song_index.refresh()
+    feed.update(frozenset({feed.song_index.path}))
+
+    messages = feed.messages_since("Evening", first)
+    assert all(isinstance(m, PatchMessage) for m in messages)
+    reorder, tempo = messages
+    assert isinstance(reorder, PatchMessage) and isinstance(tempo, PatchMessage)
+    assert reorder.base == first
+    assert reorder.patch.order == ["b", "a"]
+    assert tempo.base == reorder.version
+    assert [s.tempo.bpm for s in tempo.patch.changed] == [130.5]
+    assert feed.get("Evening").version == tempo.version
+
+
+def test_feed_snapshot_for_unknown_version(feed: SetlistFeed):
+    current = feed.get("Evening").version
+    (message,) = feed.messages_since("Evening", current - 1)
+    assert isinstance(message, SnapshotMessage)
+
+
+def test_feed_removed_setlist(feed: SetlistFeed):
+    version = feed.get("Evening").version
+    path = feed.setlist_index.directory / "evening.yaml"
+    path.unlink()
+    feed.setlist_index.update(path)
+    feed.update(frozenset({path}))
+
+    (message,) = feed.messages_since("Evening", version)
+    assert isinstance(message, SnapshotMessage)
+    assert message.setlist is None
+
+
+def test_feed_ignores_unrelated_changes(feed: SetlistFeed):
+    version = feed.get("Evening").version
+    feed.update(frozenset({feed.setlist_index.directory / "morning.yaml"}))
+    assert feed.get("Evening").version == version
@@ -0,0 +1,24 @@
+import os
+from pathlib import Path
+
+from playbacker.core.filetag import combine_tags, get_file_tag
+
+
+def test_get_file_tag(tmp_path: Path):
+    path = tmp_path / "a.yaml"
+    path.write_text("a")
+    tag = get_file_tag(path)
+    assert get_file_tag(path) == tag
+
+    path.write_text("ab")
+    assert get_file_tag(path) != tag
+
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert get_file_tag(path) != tag
+
+
+def test_combine_tags():
+    assert combine_tags(["a", "b"]) == combine_tags(["a", "b"])
+    assert combine_tags(["a", "b"]) != combine_tags(["b", "a"])
+    assert combine_tags(["ab"]) != combine_tags(["a", "b"])
@@ -0,0 +1,84 @@
+import os
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+from playbacker.core.formatting import format_yaml, format_yaml_file, order_keys
+from playbacker.core.setlist import FileSetlist
+from playbacker.core.settings import _FileSettings
+from playbacker.core.song import _FileSongs
+
+
+def test_order_keys():
+    content = {
+        "B": {"tracks": {}, "other": 1, "tempo": {"time_signature": "4/4", "bpm": 1}},
+        "A": {"tempo": {"bpm": 2}, "artist": "x"},
+    }
+    result = order_keys(content, _FileSongs)
+    assert list(result) == ["B", "A"]
+    assert list(result["B"]) == ["tempo", "tracks", "other"]
+    assert list(result["B"]["tempo"]) == ["bpm", "time_signature"]
+    assert list(result["A"]) == ["artist", "tempo"]
+
+
+def test_order_keys_in_lists():
+    content: dict[str, Any] = {
+        "devices": [{"sample_rate": 1, "name": "a"}],
+        "cache": {},
+    }
+    result = order_keys(content, _FileSettings)
+    assert list(result) == ["devices", "cache"]
+    assert list(result["devices"][0]) == ["name", "sample_rate"]
+
+
+def test_format_yaml():
+    text = "A:  {tempo: {time_signature: '4/4', bpm: 120}, artist: 'a: b'}\n"
+    expected = """\
+A:
+  artist: "a: b"
+  tempo:
+    bpm: 120
+    time_signature: 4/4
+"""
+    assert format_yaml(text, _FileSongs) == expected
+    assert format_yaml(expected, _FileSongs) == expected
+
+
+def test_format_yaml_indents_lists():
+    assert format_yaml("[a,  'b']", FileSetlist) == "- a\n- b\n"
+    text = "devices: [{channel_map: {guide: [2]}}]"
+    assert format_yaml(text, _FileSettings) == (
+        "devices:\n  - channel_map:\n      guide:\n        - 2\n"
+    )
+
+
+def test_format_yaml_keeps_comments():
+    text = "\n# Best songs\n- b   \n\n\n- a  # slow\n\n"
+    result = format_yaml(text, FileSetlist)
+    assert result == "# Best songs\n- b\n\n- a  # slow\n"
+    assert yaml.safe_load(result) == yaml.safe_load(text)
+
+
+def test_format_yaml_file(tmp_path: Path):
+    path = tmp_path / "setlist.yaml"
+    path.write_text("[a, b]")
+    assert format_yaml_file(path, FileSetlist)
+    assert path.read_text() == "- a\n- b\n"
+
+    os.utime(path, ns=(0, 0))
+    assert not format_yaml_file(path, FileSetlist)
+    assert path.stat().st_mtime_ns == 0
+
+
+def test_format_yaml_file_keeps_mode_and_symlink(tmp_path: Path):
+    path = tmp_path / "setlist.yaml"
+    path.write_text("[a]")
+    path.chmod(0o644)
+    link = tmp_path / "link.yaml"
+    link.symlink_to(path)
+
+    assert format_yaml_file(link, FileSetlist)
+    assert link.is_symlink()
+    assert path.read_text() == "- a\n"
+    assert path.stat().st_mode & 0o777 == 0o644
@@ -0,0 +1,41 @@
+import math
+
+import pytest
+
+from playbacker.core.histogram import Histogram
+
+
+@pytest.fixture
+def histogram():
+    return Histogram(bounds=(0, 1, 10))
+
+
+@pytest.mark.parametrize(
+    ("value", "bucket"), ((-5, 0), (0, 0), (0.5, 1), (1, 1), (10, 2), (11, 3))
+)
+def test_record(histogram: Histogram, value: float, bucket: int):
+    histogram.record(value)
+    assert histogram.counts[bucket] == 1
+    assert sum(histogram.counts) == 1
+
+
+def test_stats(histogram: Histogram):
+    for value in (-1, 2, 5):
+        histogram.record(value)
+
+    assert histogram.count == 3
+    assert histogram.sum == 6
+    assert histogram.mean == 2
+    assert histogram.min == -1
+    assert histogram.max == 5
+    assert histogram.buckets() == [(0, 1), (1, 0), (10, 2), (math.inf, 0)]
+
+
+def test_reset(histogram: Histogram):
+    histogram.record(3)
+    histogram.reset()
+
+    assert histogram.count == 0
+    assert histogram.sum == 0
+    assert histogram.mean == 0
+    assert histogram.counts == [0, 0, 0, 0]
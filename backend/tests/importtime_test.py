@@ -0,0 +1,78 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+# Modules that commands in playbacker.main import when called
+COMMAND_IMPORTS = {
+    "cli": [],
+    "serve": ["uvicorn", "playbacker.app"],
+    "validate": ["rich.progress", "rich.table", "playbacker.core.validate"],
+    "cache": ["rich.progress", "playbacker.core.audiofile", "playbacker.core.settings"],
+}
+AUDIO_AND_WEB = {
+    "sounddevice",
+    "soundfile",
+    "soxr",
+    "starlite",
+    "uvicorn",
+    "watchfiles",
+}
+FORBIDDEN_IMPORTS = {
+    "cli": AUDIO_AND_WEB | {"numpy"},
+    "serve": set[str](),
+    "validate": AUDIO_AND_WEB,
+    "cache": AUDIO_AND_WEB,
+}
+# Recorded with `PLAYBACKER_UPDATE_IMPORTTIME=1 pytest tests/importtime_test.py`
+BASELINE_PATH = Path(__file__).parent / "importtime_baseline.json"
+# Cold start may be this many times slower than baseline, machines differ
+TOLERANCE = 3
+
+
+def measure_imports(command: str) -> tuple[set[str], int]:
+    """Modules imported on cold start of command and total time in microseconds."""
+    code = "\n".join(
+        f"import {module}" for module in ("playbacker.main", *COMMAND_IMPORTS[command])
+    )
+    result = subprocess.run(
+        (sys.executable, "-X", "importtime", "-c", code),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules: set[str] = set()
+    total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line.removeprefix("import time:").split("|")
+        modules.add(name.strip())
+        total += int(self_us)
+    return modules, total
+
+
+@pytest.fixture(scope="module")
+def baseline() -> dict[str, int]:
+    if os.environ.get("PLAYBACKER_UPDATE_IMPORTTIME"):
+        # Best of several runs to reduce noise
+        content = {
+            command: min(measure_imports(command)[1] for _ in range(5))
+            for command in COMMAND_IMPORTS
+        }
+        BASELINE_PATH.write_text(json.dumps(content, indent=2) + "\n")
+    return json.loads(BASELINE_PATH.read_text())
+
+
+@pytest.mark.parametrize("command", COMMAND_IMPORTS)
+def test_command_cold_start(command: str, baseline: dict[str, int]):
+    modules, total = min(
+        (measure_imports(command) for _ in range(2)), key=lambda result: result[1]
+    )
+    top_level = {module.split(".")[0] for module in modules}
+
+    assert not top_level & FORBIDDEN_IMPORTS[command]
+    assert total <= baseline[command] * TOLERANCE
@@ -0,0 +1,58 @@
+import gc
+from unittest.mock import Mock
+
+import pytest
+
+from playbacker.core.memory import MemoryMode
+
+
+@pytest.fixture
+def memory():
+    threshold = gc.get_threshold()
+    memory = MemoryMode(playing_threshold=12345)
+    yield memory
+    memory.uninstall()
+    gc.set_threshold(*threshold)
+
+
+def test_enter_leave_playback(memory: MemoryMode, monkeypatch: pytest.MonkeyPatch):
+    threshold = gc.get_threshold()
+    collect = Mock()
+    monkeypatch.setattr(gc, "collect", collect)
+
+    memory.enter_playback()
+    memory.enter_playback()
+    assert gc.get_threshold() == (*threshold[:2], 12345)
+    assert memory.saved_threshold == threshold
+
+    memory.leave_playback()
+    memory.leave_playback()
+    assert gc.get_threshold() == threshold
+    collect.assert_called_once_with()
+
+
+def test_freeze(memory: MemoryMode, monkeypatch: pytest.MonkeyPatch):
+    collect, freeze = Mock(), Mock()
+    monkeypatch.setattr(gc, "collect", collect)
+    monkeypatch.setattr(gc, "freeze", freeze)
+
+    memory.freeze()
+    collect.assert_called_once_with()
+    freeze.assert_called_once_with()
+
+
+def test_install_records_pauses(memory: MemoryMode):
+    memory.install()
+    gc.collect()
+    memory.uninstall()
+    gc.collect()
+
+    assert memory.pauses.count == 1
+
+
+def test_long_pause_reported(memory: MemoryMode, capsys: pytest.CaptureFixture[str]):
+    memory.report_threshold = -1
+    memory._callback("start", {"generation": 2, "collected": 0})
+    memory._callback("stop", {"generation": 2, "collected": 5})
+
+    assert "GC pause in generation 2" in capsys.readouterr().out
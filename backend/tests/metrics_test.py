@@ -0,0 +1,108 @@
+import asyncio
+from pathlib import Path
+from typing import Any, cast
+from unittest.mock import Mock
+
+import numpy
+from starlite import Controller, Router
+
+from playbacker.core.audiofile import AudioCache, AudioFile
+from playbacker.core.clock import Clock
+from playbacker.core.histogram import Histogram
+from playbacker.core.player import Player
+from playbacker.core.stream import CallbackStats
+from playbacker.metrics import (
+    RequestTimingMiddleware,
+    ServerMetrics,
+    format_metric,
+    histogram_samples,
+    render_metrics,
+)
+
+
+def test_format_metric():
+    lines = format_metric(
+        "name", "counter", "Help.", [("", {}, 1), ("_x", {"a": "b", "c": "d"}, 2.5)]
+    )
+    assert lines == [
+        "# HELP name Help.",
+        "# TYPE name counter",
+        "name 1",
+        'name_x{a="b",c="d"} 2.5',
+    ]
+
+
+def test_histogram_samples():
+    histogram = Histogram(bounds=(1, 2))
+    for value in (0.5, 1.5, 1.5, 3):
+        histogram.record(value)
+
+    assert histogram_samples(histogram, {"a": "b"}) == [
+        ("_bucket", {"a": "b", "le": "1"}, 1),
+        ("_bucket", {"a": "b", "le": "2"}, 3),
+        ("_bucket", {"a": "b", "le": "+Inf"}, 4),
+        ("_sum", {"a": "b"}, 6.5),
+        ("_count", {"a": "b"}, 4),
+    ]
+
+
+def test_server_metrics_record_request():
+    metrics = ServerMetrics()
+    metrics.record_request("a", 0.1)
+    metrics.record_request("a", 0.2)
+    assert metrics.request_latency["a"].count == 2
+
+
+def run_middleware(owner: Any) -> ServerMetrics:
+    metrics = ServerMetrics()
+    app = Mock(return_value=asyncio.sleep(0))
+    middleware = RequestTimingMiddleware(app, metrics=metrics)
+    handler = Mock(owner=owner, handler_name="handler")
+    scope = cast(Any, {"type": "http", "route_handler": handler})
+
+    asyncio.run(middleware(scope, Mock(), Mock()))
+    app.assert_called_once()
+    return metrics
+
+
+def test_request_timing_middleware_records_controller_handlers():
+    metrics = run_middleware(Controller(owner=Router(path="/", route_handlers=[])))
+    assert metrics.request_latency["handler"].count == 1
+
+
+def test_request_timing_middleware_skips_other_handlers():
+    assert run_middleware(None).request_latency == {}
+
+
+def get_player() -> Player:
+    file = AudioFile(Path("a.wav"), 44100, AudioCache(Path("cache"), max_size=0))
+    file.__dict__["data"] = numpy.zeros((10, 2))
+    file.cache.hits = 3  # pyright: ignore[reportOptionalMemberAccess]
+
+    playback = Mock()
+    playback.clock = Mock(spec=Clock, lateness=Histogram(bounds=(0,)))
+    playback.mixer.stats = CallbackStats(output_underflows=2)
+    playback.tracks.multitrack.count_underruns.return_value = 4
+    playback.tracks.guide.count_underruns.return_value = 0
+    playback.settings.sounds.metronome = (file,)
+    playback.settings.sounds.countdown = (AudioFile(Path("b.wav"), 44100),)
+    return Player(playback)
+
+
+def test_render_metrics():
+    server = ServerMetrics(watchers=2, dropped_watchers=1)
+    server.record_request("reset", 0.01)
+    lines = render_metrics(get_player(), server).splitlines()
+
+    assert 'playbacker_clock_tick_lateness_seconds_bucket{le="+Inf"} 0' in lines
+    assert "playbacker_audio_callback_duration_seconds_count 0" in lines
+    assert "playbacker_output_underflows_total 2" in lines
+    assert 'playbacker_backing_track_underruns_total{track="multitrack"} 4' in lines
+    assert "playbacker_audio_cache_hits_total 3" in lines
+    assert "playbacker_audio_cache_misses_total 0" in lines
+    assert "playbacker_decoded_audio_bytes 160" in lines
+    assert 'playbacker_http_request_duration_seconds_count{handler="reset"} 1' in lines
+    assert "playbacker_gc_pause_seconds_count 0" in lines
+    assert any(line.startswith("playbacker_yaml_parse_seconds_count") for line in lines)
+    assert "playbacker_watch_connections 2" in lines
+    assert "playbacker_watch_dropped_total 1" in lines
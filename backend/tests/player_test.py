@@ -0,0 +1,78 @@
+import asyncio
+import threading
+import time
+from typing import Any, cast
+from unittest.mock import Mock
+
+import pytest
+
+from playbacker.core.player import AsyncPlayer, Player
+from playbacker.core.tempo import Tempo
+
+
+@pytest.fixture
+def player():
+    return Player(cast(Any, Mock()))
+
+
+def test_toggle_playing(player: Player, tempo: Tempo):
+    player.toggle_playing(tempo)
+    assert player.playing
+    cast(Mock, player.playback).start.assert_called_once_with(tempo=tempo, song=None)
+
+    player.toggle_playing(tempo)
+    assert not player.playing
+    cast(Mock, player.playback).pause.assert_called_once_with()
+
+
+def test_toggle_guide_enabled(player: Player):
+    player.guide_enabled = True
+    player.toggle_guide_enabled()
+    assert player.guide_enabled is False
+
+
+def test_async_player_runs_commands_on_control_thread(player: Player):
+    async_player = AsyncPlayer(player)
+
+    async def main():
+        thread_ids = {
+            await async_player.run(threading.get_ident),
+            await async_player.run(threading.get_ident),
+        }
+        await async_player.stop()
+        return thread_ids
+
+    thread_ids = asyncio.run(main())
+    assert len(thread_ids) == 1
+    assert threading.get_ident() not in thread_ids
+    cast(Mock, player.playback).destroy.assert_called_once_with()
+
+
+def test_async_player_doesnt_block_event_loop(player: Player, tempo: Tempo):
+    async_player = AsyncPlayer(player)
+
+    def start(**_: Any):
+        time.sleep(0.05)
+
+    cast(Mock, player.playback).start.side_effect = start
+
+    async def main():
+        command = asyncio.create_task(async_player.toggle_playing(tempo))
+        await asyncio.sleep(0.01)
+        # Loop keeps serving while command is running
+        done_before = command.done()
+        await command
+        return done_before
+
+    assert asyncio.run(main()) is False
+    assert player.playing
+
+
+def test_async_player_timeout(player: Player):
+    async_player = AsyncPlayer(player, timeout=0.01)
+
+    async def main():
+        await async_player.run(lambda: time.sleep(0.1))
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(main())
@@ -0,0 +1,75 @@
+import os
+from unittest.mock import Mock
+
+import pytest
+
+from playbacker.core.realtime import (
+    RealtimeSettings,
+    SchedulingPolicy,
+    apply_realtime_settings,
+)
+
+
+@pytest.fixture
+def setaffinity(monkeypatch: pytest.MonkeyPatch):
+    mock = Mock()
+    monkeypatch.setattr(os, "sched_setaffinity", mock, raising=False)
+    return mock
+
+
+@pytest.fixture
+def setscheduler(monkeypatch: pytest.MonkeyPatch):
+    mock = Mock()
+    monkeypatch.setattr(os, "sched_setscheduler", mock, raising=False)
+    monkeypatch.setattr(os, "SCHED_FIFO", 1, raising=False)
+    monkeypatch.setattr(os, "SCHED_RR", 2, raising=False)
+    monkeypatch.setattr(os, "sched_param", int, raising=False)
+    return mock
+
+
+def test_disabled_by_default(setaffinity: Mock, setscheduler: Mock):
+    apply_realtime_settings(RealtimeSettings(), "audio")
+    setaffinity.assert_not_called()
+    setscheduler.assert_not_called()
+
+
+@pytest.mark.parametrize(("policy", "value"), (("fifo", 1), ("rr", 2)))
+def test_applied(
+    setaffinity: Mock, setscheduler: Mock, policy: SchedulingPolicy, value: int
+):
+    settings = RealtimeSettings(policy=policy, priority=70, cpus=[2, 3])
+    apply_realtime_settings(settings, "audio")
+
+    setaffinity.assert_called_once_with(0, [2, 3])
+    setscheduler.assert_called_once_with(0, value, 70)
+
+
+def test_permission_error_reported(
+    setscheduler: Mock, capsys: pytest.CaptureFixture[str]
+):
+    setscheduler.side_effect = PermissionError
+    apply_realtime_settings(RealtimeSettings(policy="fifo"), "clock")
+    assert (
+        "Not permitted to set FIFO priority 50 for clock thread"
+        in capsys.readouterr().err
+    )
+
+
+def test_affinity_error_reported(setaffinity: Mock, capsys: pytest.CaptureFixture[str]):
+    setaffinity.side_effect = OSError("Invalid argument")
+    apply_realtime_settings(RealtimeSettings(cpus=[100]), "audio")
+    assert "Can't pin audio thread to CPUs [100]" in capsys.readouterr().err
+
+
+def test_unsupported_os_reported(
+    monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+):
+    monkeypatch.delattr(os, "sched_setaffinity", raising=False)
+    monkeypatch.delattr(os, "sched_setscheduler", raising=False)
+    apply_realtime_settings(RealtimeSettings(policy="rr", cpus=[0]), "audio")
+    assert capsys.readouterr().err.count("not supported on this OS") == 2
+
+
+def test_priority_validated():
+    with pytest.raises(ValueError):
+        RealtimeSettings(policy="fifo", priority=100)
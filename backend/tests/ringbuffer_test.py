@@ -0,0 +1,75 @@
+import tracemalloc
+
+import numpy
+import pytest
+
+from playbacker.core.ringbuffer import RingBuffer
+
+
+def frames(*values: float):
+    return numpy.array([[v] for v in values])
+
+
+@pytest.fixture
+def buffer():
+    return RingBuffer(capacity=4, channels=1)
+
+
+def test_write_read_wraps(buffer: RingBuffer):
+    out = numpy.zeros((3, 1))
+
+    assert buffer.write(frames(1, 2, 3)) == 3
+    assert buffer.read_into(out) == 3
+    assert buffer.write(frames(4, 5, 6, 7, 8)) == 4
+    assert buffer.available == 4
+    assert buffer.fill == 1
+
+    assert buffer.read_into(out) == 3
+    assert out.tolist() == [[4], [5], [6]]
+    assert buffer.write(frames(8, 9)) == 2
+    assert buffer.read_into(out) == 3
+    assert out.tolist() == [[7], [8], [9]]
+    assert buffer.available == 0
+    assert buffer.underruns == 0
+
+
+def test_high_water(buffer: RingBuffer):
+    buffer.write(frames(1, 2, 3))
+    buffer.read_into(numpy.zeros((3, 1)))
+    buffer.write(frames(4))
+    assert buffer.high_water == 3
+
+
+def test_underrun(buffer: RingBuffer):
+    out = numpy.ones((3, 1))
+    buffer.write(frames(1))
+
+    assert buffer.read_into(out) == 3
+    assert out.tolist() == [[1], [0], [0]]
+    assert buffer.underruns == 1
+
+
+def test_closed(buffer: RingBuffer):
+    out = numpy.zeros((3, 1))
+    buffer.write(frames(1))
+    buffer.close()
+
+    assert buffer.read_into(out) == 1
+    assert buffer.read_into(out) == 0
+    assert buffer.underruns == 0
+
+
+def test_read_does_not_allocate(buffer: RingBuffer):
+    out = numpy.zeros((2, 1))
+    chunk = frames(1, 2)
+
+    tracemalloc.start()
+    buffer.write(chunk)
+    buffer.read_into(out)
+    before, _ = tracemalloc.get_traced_memory()
+    buffer.write(chunk)
+    buffer.read_into(out)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert after == before
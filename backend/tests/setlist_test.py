@@ -1,14 +1,17 @@
 import uuid
+from pathlib import Path
 
 import pytest
 
 from playbacker.core.setlist import (
     NoSongInStorageError,
     Setlist,
+    SetlistEntry,
+    SetlistIndex,
     _find_song_in_storage,
     load_setlist,
 )
-from playbacker.core.song import Song
+from playbacker.core.song import Song, index_songs
 from tests.conftest import generate_tempo
 
 
@@ -24,16 +27,74 @@ def setlist():
 
 def test_find_song_in_storage():
     songs = [gen_song() for _ in range(5)]
-    assert _find_song_in_storage(name=songs[2].name.upper(), storage=songs) == songs[2]
+    storage = index_songs(songs)
+    assert (
+        _find_song_in_storage(name=songs[2].name.upper(), storage=storage) == songs[2]
+    )
 
     with pytest.raises(NoSongInStorageError):
-        _find_song_in_storage(name="asong", storage=songs)
+        _find_song_in_storage(name="asong", storage=storage)
 
 
 def test_load_setlist():
     songs = [gen_song() for _ in range(5)]
     content = [songs[0].name, songs[3].name]
-    result = load_setlist(name="Worship Night", content=content, songs=songs)
+    result = load_setlist(
+        name="Worship Night", content=content, songs=index_songs(songs)
+    )
 
     assert result.name == "Worship Night"
     assert result.songs == [songs[0], songs[3]]
+
+
+def test_setlist_index_refresh(tmp_path: Path):
+    (tmp_path / "2023.01.01 morning.yaml").write_text("- a\n- b")
+    (tmp_path / "2023.01.08 morning.yaml").write_text("- c")
+    (tmp_path / "notes.txt").write_text("")
+    index = SetlistIndex(tmp_path)
+    index.refresh()
+
+    assert index.names == ["2023.01.08 Morning", "2023.01.01 Morning"]
+    assert index.get_path("2023.01.08 Morning") == tmp_path / "2023.01.08 morning.yaml"
+    entry = index.get("2023.01.01 Morning")
+    assert entry and entry.content == ["a", "b"]
+
+
+def test_setlist_index_update(tmp_path: Path):
+    index = SetlistIndex(tmp_path)
+    index.refresh()
+    path = tmp_path / "evening.yaml"
+
+    empty_tag = index.names_tag
+    path.write_text("- a")
+    index.update(path)
+    assert index.names == ["Evening"]
+    entry = index.get("Evening")
+    assert entry and entry.content == ["a"] and entry.tag
+    assert index.names_tag != empty_tag
+
+    path.write_text("- [a")
+    index.update(path)
+    assert index.get("Evening") == SetlistEntry(path=path, tag=None, content=None)
+
+    path.unlink()
+    index.update(path)
+    assert index.names == []
+    assert index.get_path("Evening") is None
+
+    index.update(tmp_path / "notes.txt")
+    index.update(tmp_path / "nested" / "other.yaml")
+    assert index.names == []
+
+
+def test_setlist_index_update_replaces_entries(tmp_path: Path):
+    path = tmp_path / "evening.yaml"
+    path.write_text("- a")
+    index = SetlistIndex(tmp_path)
+    index.refresh()
+    entries = index.entries
+
+    path.write_text("- b")
+    index.update(path)
+    assert index.entries is not entries
+    assert entries["Evening"].content == ["a"]
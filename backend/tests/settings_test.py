@@ -1,7 +1,10 @@
 from pathlib import Path
+from unittest.mock import Mock
 
 import pytest
 import sounddevice
+
+import playbacker.core.settings
 from playbacker.core.settings import (
     Settings,
     _ChannelMap,
@@ -15,7 +18,10 @@ from playbacker.core.settings import (
     _get_device_props,
     _MetronomePaths,
     _SoundPaths,
+    get_all_audiofiles,
+    load_audio_cache,
     load_settings,
+    preload_sounds,
 )
 
 
@@ -124,6 +130,14 @@ def test_convert_file_settings(file_settings: _FileSettings):
     assert settings.sample_rate == device.sample_rate
     assert settings.channel_map == device.channel_map
     assert settings.channel_limit == 16
+    assert settings.transport == file_settings.transport
+    assert settings.scheduler == file_settings.scheduler
+    assert settings.prerender == file_settings.prerender
+    assert settings.realtime == file_settings.realtime
+
+    assert sounds.metronome.accent.sample_rate == device.sample_rate
+    assert sounds.metronome.accent.cache
+    assert sounds.metronome.accent.cache.directory == file_settings.cache.directory
 
     assert sounds.metronome.accent.path == file_settings.sounds.metronome.accent
     assert sounds.metronome.tick_1_4.path == file_settings.sounds.metronome.tick_1_4
@@ -141,3 +155,36 @@ def test_load_settings(file_settings: _FileSettings, devices: list[_Device]):
         file_settings.dict(by_alias=True), device_name=devices[2].pretty_name
     )
     assert type(settings) == Settings
+
+
+@pytest.mark.usefixtures("patched_query_devices")
+def test_preload_sounds(
+    file_settings: _FileSettings,
+    devices: list[_Device],
+    monkeypatch: pytest.MonkeyPatch,
+):
+    settings = load_settings(
+        file_settings.dict(by_alias=True), device_name=devices[2].pretty_name
+    )
+    mock = Mock(return_value=[])
+    monkeypatch.setattr(playbacker.core.settings, "preload_audiofiles", mock)
+
+    assert preload_sounds(settings) == []
+    mock.assert_called_once_with(
+        (*settings.sounds.metronome, *settings.sounds.countdown)
+    )
+
+
+def test_load_audio_cache(file_settings: _FileSettings):
+    file_settings.cache.max_size_mb = 1
+    cache = load_audio_cache(file_settings.dict(by_alias=True))
+    assert cache.directory == file_settings.cache.directory
+    assert cache.max_size == 1024 * 1024
+
+
+def test_get_all_audiofiles(file_settings: _FileSettings):
+    files = get_all_audiofiles(file_settings.dict(by_alias=True))
+
+    assert len(files) == 8 * 2  # Two distinct sample rates
+    assert {f.sample_rate for f in files} == {44100, 48000}
+    assert all(f.cache for f in files)
@@ -0,0 +1,114 @@
+import pickle
+from pathlib import Path
+from typing import Any
+
+import numpy
+import pytest
+import sounddevice
+import yaml
+
+import playbacker.snapshot
+from playbacker.config import Config
+from playbacker.core.audiofile import AudioFile
+from playbacker.snapshot import (
+    Snapshot,
+    build_snapshot,
+    get_fingerprint,
+    get_snapshot,
+    get_snapshot_path,
+    load_snapshot,
+    save_snapshot,
+)
+
+
+@pytest.fixture
+def config(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Config:
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+
+    def query_devices(device: str | None, kind: str) -> Any:
+        raise AssertionError("snapshot must not depend on device")
+
+    monkeypatch.setattr(sounddevice, "query_devices", query_devices)
+
+    sound = str(tmp_path / "a.wav")
+    content: dict[str, Any] = {
+        "devices": [
+            {
+                "name": None,
+                "pretty_name": "default",
+                "sample_rate": 44100,
+                "channel_map": {"metronome": [1], "guide": [2], "multitrack": [1]},
+            }
+        ],
+        "sounds": {
+            "metronome": {"accent": sound, "1/4": sound, "1/8": sound, "1/16": sound},
+            "countdown": {f"count_{i}": sound for i in range(1, 5)},
+        },
+    }
+    (tmp_path / "config.yaml").write_text(yaml.dump(content))
+    song = {"tempo": {"bpm": 120, "time_signature": "4/4", "duration": "1/4"}}
+    (tmp_path / "songs.yaml").write_text(yaml.dump({"A": song}))
+    (tmp_path / "setlists").mkdir()
+    (tmp_path / "setlists" / "evening.yaml").write_text("- a")
+    return Config(config_dir_path=tmp_path, device="default")
+
+
+def test_build_snapshot(config: Config):
+    snapshot = build_snapshot(config)
+    assert snapshot.config["devices"][0]["sample_rate"] == 44100
+    assert snapshot.song_index.get("a")
+    entry = snapshot.setlist_index.get("Evening")
+    assert entry and entry.content == ["a"]
+
+
+def test_get_snapshot_reuses_saved_one(config: Config, monkeypatch: pytest.MonkeyPatch):
+    snapshot = get_snapshot(config)
+    assert get_snapshot_path(config.config_dir_path).exists()
+
+    def fail(config: Config) -> Snapshot:
+        raise AssertionError
+
+    monkeypatch.setattr(playbacker.snapshot, "build_snapshot", fail)
+    loaded = get_snapshot(config)
+    assert loaded is not snapshot
+    song = loaded.song_index.get("a")
+    assert song and song.tempo.lag == snapshot.song_index.songs["a"].tempo.lag
+
+
+def test_fingerprint_changes_with_sources(
+    config: Config, monkeypatch: pytest.MonkeyPatch
+):
+    fingerprint = get_fingerprint(config)
+    (config.config_dir_path / "setlists" / "morning.yaml").write_text("- a")
+    assert get_fingerprint(config) != fingerprint
+
+    fingerprint = get_fingerprint(config)
+    (config.config_dir_path / "songs.yaml").write_text("{}")
+    assert get_fingerprint(config) != fingerprint
+
+    fingerprint = get_fingerprint(config)
+    monkeypatch.setattr(playbacker.snapshot, "get_code_tag", lambda: "other")
+    assert get_fingerprint(config) != fingerprint
+
+    fingerprint = get_fingerprint(config)
+    assert get_fingerprint(config.copy(update={"device": "other"})) == fingerprint
+
+
+def test_load_snapshot_rejects_other_sources(config: Config, tmp_path: Path):
+    path = tmp_path / "snapshot.pickle"
+    save_snapshot(path, "a", build_snapshot(config))
+
+    assert load_snapshot(path, "a")
+    assert load_snapshot(path, "b") is None
+    assert load_snapshot(tmp_path / "missing.pickle", "a") is None
+
+    path.write_bytes(path.read_bytes()[:100])
+    assert load_snapshot(path, "a") is None
+
+
+def test_audiofile_is_pickled_without_data():
+    file = AudioFile(Path("a.wav"), 44100)
+    file.__dict__["data"] = numpy.zeros((10, 2))
+    loaded = pickle.loads(pickle.dumps(file))
+    assert loaded == file
+    assert not loaded.loaded
@@ -1,12 +1,16 @@
 from pathlib import Path
 
 import pytest
+import yaml
+from pydantic import ValidationError
 
 from playbacker.core.song import (
     Song,
+    SongIndex,
     _convert_file_song,
     _FileSong,
     _TrackPaths,
+    index_songs,
     load_songs,
 )
 from playbacker.core.tempo import Tempo
@@ -26,6 +30,16 @@ def test_convert_file_song(tempo: Tempo, file_song: _FileSong):
     assert result.name == "asong"
     assert result.artist == "me"
     assert result.tempo == tempo
+    assert result.tracks == file_song.tracks
+
+
+def test_convert_file_song_resolves_tracks(file_song: _FileSong, tmp_path: Path):
+    tracks = _TrackPaths(multitrack=Path("/abs.wav"), guide=Path("guide.wav"))
+    song = file_song.copy(update={"tracks": tracks})
+    result = _convert_file_song(name="asong", song=song, directory=tmp_path)
+    assert result.tracks == _TrackPaths(
+        multitrack=Path("/abs.wav"), guide=tmp_path / "guide.wav"
+    )
 
 
 def test_load_songs(file_song: _FileSong):
@@ -34,3 +48,62 @@ def test_load_songs(file_song: _FileSong):
 
     assert len(songs) == len(content)
     assert all(type(s) == Song for s in songs)
+
+
+def test_index_songs(tempo: Tempo):
+    first = Song(name="ASong", artist="me", tempo=tempo)
+    second = Song(name="asong", artist="you", tempo=tempo)
+    assert index_songs([first, second]) == {"asong": first}
+
+
+def write_songs(path: Path, tempos: dict[str, float]):
+    content = {
+        name: {
+            "artist": "me",
+            "tempo": {"bpm": bpm, "time_signature": "4/4", "duration": "1/4"},
+        }
+        for name, bpm in tempos.items()
+    }
+    path.write_text(yaml.dump(content))
+
+
+def test_song_index_refresh(tmp_path: Path):
+    path = tmp_path / "songs.yaml"
+    write_songs(path, {"ASong": 120, "BSong": 100, "CSong": 90})
+    index = SongIndex(path)
+    index.refresh()
+
+    tag = index.tag
+    a, b = index.get("asong"), index.get("BSONG")
+    assert a and a.name == "ASong"
+    assert b and b.tempo.bpm == 100
+
+    write_songs(path, {"ASong": 120, "BSong": 130})
+    index.refresh()
+    assert index.tag != tag
+
+    assert index.get("asong") is a
+    new_b = index.get("bsong")
+    assert new_b and new_b.tempo.bpm == 130
+    assert index.get("csong") is None
+
+
+def test_song_index_resolves_tracks(tmp_path: Path):
+    path = tmp_path / "songs.yaml"
+    song = {
+        "tempo": {"bpm": 120, "time_signature": "4/4", "duration": "1/4"},
+        "tracks": {"guide": "guide.wav"},
+    }
+    path.write_text(yaml.dump({"ASong": song}))
+    index = SongIndex(path)
+    index.refresh()
+
+    result = index.get("asong")
+    assert result and result.tracks.guide == tmp_path / "guide.wav"
+
+
+def test_song_index_refresh_invalid(tmp_path: Path):
+    path = tmp_path / "songs.yaml"
+    path.write_text("- not a mapping")
+    with pytest.raises(ValidationError):
+        SongIndex(path).refresh()
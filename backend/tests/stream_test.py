@@ -1,4 +1,6 @@
+import itertools
 import time
+import tracemalloc
 from collections.abc import Callable
 from typing import Any, cast
 from unittest.mock import Mock
@@ -8,10 +10,15 @@ import pytest
 import sounddevice
 
 from playbacker.core.audiofile import AudioArray
+from playbacker.core.clock import FrameClock
 from playbacker.core.stream import (
+    CallbackStats,
+    SounddeviceMixer,
     SounddeviceStream,
-    allocate_data_to_channels,
+    compile_channel_gains,
     convert_channel_map_to_coreaudio_format,
+    resize_buffer,
+    route_data_to_channels,
 )
 
 channel_maps: tuple[list[int], ...] = ([1, 2], [1, 2], [2], [], [], [1, 2, 3, 4, 5, 10])
@@ -36,27 +43,43 @@ def test_convert_channel_map_to_coreaudio_format(
 
 
 @pytest.mark.parametrize(("map", "limit"), zip(channel_maps, channel_limits))
-def test_allocate_data_to_channels(map: list[int], limit: int):
-    data: numpy.ndarray[Any, Any] = numpy.ndarray((1, 2))
-    data.fill(0)
+def test_compile_channel_gains(map: list[int], limit: int):
+    gains = compile_channel_gains(map, limit)
+    outputs = [idx for idx in range(limit) if idx + 1 in map]
 
-    res = allocate_data_to_channels(data, channel_map=map, channel_limit=limit)
-    assert len(res) <= limit
+    assert gains.shape == (len(outputs), limit)
+    for row, output in enumerate(outputs):
+        assert gains[row, output] == 1
+        assert gains[row].sum() == 1
 
-    count = 0
 
-    for idx, array in res.items():
-        assert idx in map
-        if count < data.shape[1]:
-            assert array.shape == (1, 1)
+@pytest.mark.parametrize(("map", "limit"), zip(channel_maps, channel_limits))
+def test_route_data_to_channels(map: list[int], limit: int):
+    data: numpy.ndarray[Any, Any] = numpy.array([[1.0, 2.0], [3.0, 4.0], [5.0, 6.0]])
+    out: numpy.ndarray[Any, Any] = numpy.ones((4, limit))
+
+    route_data_to_channels(data, compile_channel_gains(map, limit), out)
+    outputs = [idx for idx in range(limit) if idx + 1 in map]
+
+    for idx in range(limit):
+        if idx in outputs[: data.shape[1]]:
+            assert list(out[:3, idx]) == list(data[:, outputs.index(idx)])
         else:
-            assert array.shape == (1, 0)  # Track's channels already allocated
-        count += 1
+            assert (out[:3, idx] == 0).all()
+    assert (out[3] == 1).all()  # Rows after data are untouched
+
+
+def test_resize_buffer():
+    buffer: numpy.ndarray[Any, Any] = numpy.zeros((4, 2))
+    assert resize_buffer(buffer, 3) is buffer
+    assert resize_buffer(buffer, 4) is buffer
+    assert resize_buffer(buffer, 5).shape == (5, 2)
 
 
 class StreamWithoutPostinit(SounddeviceStream):
     def __post_init__(self) -> None:
-        pass
+        self.gains = compile_channel_gains(self.channel_map, self.channel_limit)
+        self.buffer = numpy.zeros((1, self.channel_limit))
 
 
 @pytest.fixture
@@ -111,7 +134,9 @@ def call_callback_in_mock_stream(
     outdata: numpy.ndarray[Any, Any] = numpy.ndarray((1, channel_limit))
     outdata.fill(0)
 
-    stream._callback(outdata=outdata, frames=512, time=..., status=cast(Any, ...))
+    stream._callback(
+        outdata=outdata, frames=512, time=..., status=sounddevice.CallbackFlags()
+    )
     return outdata
 
 
@@ -140,3 +165,196 @@ def test_callback_without_sound(map: list[int], limit: int):
     outdata = call_callback_in_mock_stream(lambda _: None, map, limit)
     for idx in range(limit):
         assert outdata[:, idx][0] == 0
+
+
+class MixerWithoutPostinit(SounddeviceMixer):
+    def __post_init__(self) -> None:
+        self.buffer = numpy.zeros((4, self.channel_limit))
+        self.scratch = numpy.zeros_like(self.buffer)
+
+
+@pytest.fixture
+def mixer():
+    return MixerWithoutPostinit(sample_rate=48000, channel_limit=4, device_name=None)
+
+
+def test_mixer_init(monkeypatch: pytest.MonkeyPatch, mixer: SounddeviceMixer):
+    mock = Mock()
+    monkeypatch.setattr(sounddevice, "OutputStream", mock)
+
+    SounddeviceMixer.__post_init__(mixer)
+    mixer.ready.wait(1)
+
+    assert mixer.ready.is_set()
+    mock.assert_called_once()
+    assert mock.call_args.kwargs["channels"] == 4
+    cast(Mock, mixer.stream.start).assert_called_once_with()
+
+
+def test_mixer_add_remove_input(mixer: SounddeviceMixer):
+    first = mixer.add_input(lambda _: None, channel_map=[1])
+    second = mixer.add_input(lambda _: None, channel_map=[2])
+
+    assert mixer.inputs == [first, second]
+    assert first.ready is mixer.ready
+    assert first.sample_rate == mixer.sample_rate
+
+    first.destroy()
+    assert mixer.inputs == [second]
+
+
+def call_mixer_callback(mixer: SounddeviceMixer, frames: int) -> AudioArray:
+    outdata: numpy.ndarray[Any, Any] = numpy.ndarray((frames, mixer.channel_limit))
+    outdata.fill(5)
+    mixer._callback(
+        outdata=outdata, frames=frames, time=..., status=sounddevice.CallbackFlags()
+    )
+    return outdata
+
+
+def test_mixer_callback_sums_inputs(mixer: SounddeviceMixer):
+    def get_sound(value: float, channels: int):
+        def func(frames: int):
+            array: numpy.ndarray[Any, Any] = numpy.ndarray((frames - 1, channels))
+            array.fill(value)
+            return array
+
+        return func
+
+    mixer.add_input(get_sound(0.25, channels=2), channel_map=[1, 2])
+    mixer.add_input(get_sound(0.5, channels=1), channel_map=[2, 3])
+    mixer.add_input(lambda _: None, channel_map=[4])
+
+    outdata = call_mixer_callback(mixer, frames=8)
+
+    assert (outdata[:7, 0] == 0.25).all()
+    assert (outdata[:7, 1] == 0.75).all()
+    assert (outdata[:, 2:] == 0).all()
+    assert (outdata[7] == 0).all()
+
+
+def test_mixer_callback_grows_buffer(mixer: SounddeviceMixer):
+    mixer.add_input(lambda frames: numpy.ones((frames, 1)), channel_map=[3])
+    outdata = call_mixer_callback(mixer, frames=16)
+
+    assert len(mixer.buffer) == 16
+    assert (outdata[:, 2] == 1).all()
+
+
+def test_mixer_callback_splits_block_on_clock_ticks(mixer: SounddeviceMixer):
+    ticks: list[int] = []
+    sizes: list[int] = []
+    clock = FrameClock(lambda: ticks.append(clock.frame), sample_rate=8)
+    clock.lag = 0.5  # 4 frames
+    clock.start()
+    mixer.clock = clock
+
+    def get_sound(frames: int):
+        sizes.append(frames)
+        return numpy.full((frames, 1), len(ticks), dtype=float)
+
+    mixer.add_input(get_sound, channel_map=[1])
+    outdata = call_mixer_callback(mixer, frames=10)
+
+    assert ticks == [4, 8]
+    assert sizes == [4, 4, 2]
+    assert list(outdata[:, 0]) == [0] * 4 + [1] * 4 + [2] * 2
+
+
+def test_mixer_destroy(monkeypatch: pytest.MonkeyPatch, mixer: SounddeviceMixer):
+    mock = Mock()
+    mixer.stream = mock
+
+    monkeypatch.setattr(time, "sleep", Mock())
+    mixer.destroy()
+    time.sleep(0.1)
+    cast(Any, mock).stop.assert_called_once_with()
+    cast(Any, mock).close.assert_called_once_with()
+
+
+def measure_callback_allocations(callback: Callable[[], None], periods: int):
+    """Run callback for number of periods, return retained and peak allocated bytes."""
+    # Warm up: buffers may be reallocated on first period,
+    # stats counters have to leave range of preallocated small ints
+    for _ in itertools.repeat(None, 300):
+        callback()
+    tracemalloc.start()
+    try:
+        start, _ = tracemalloc.get_traced_memory()
+        for _ in itertools.repeat(None, periods):
+            callback()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return current - start, peak - start
+
+
+def assert_callback_does_not_allocate(callback: Callable[[], None], data: AudioArray):
+    retained_short, _ = measure_callback_allocations(callback, periods=10)
+    retained_long, peak = measure_callback_allocations(callback, periods=1000)
+
+    # Memory doesn't grow with number of periods
+    assert retained_long == retained_short
+    # Only short-lived array views, not even a single channel of audio is copied
+    assert peak < len(data) * data.itemsize
+
+
+def test_stream_callback_does_not_allocate():
+    frames, limit = 512, 16
+    data: numpy.ndarray[Any, Any] = numpy.ones((frames - 12, 2))
+    outdata: numpy.ndarray[Any, Any] = numpy.zeros((frames, limit), dtype="float32")
+    stream = StreamWithoutPostinit(
+        sound_getter=lambda _: data,
+        sample_rate=48000,
+        channel_map=[3, 4],
+        channel_limit=limit,
+        device_name=None,
+    )
+    assert_callback_does_not_allocate(
+        lambda: stream._callback(outdata, frames, ..., sounddevice.CallbackFlags()),
+        data,
+    )
+
+
+def test_mixer_callback_does_not_allocate(mixer: SounddeviceMixer):
+    frames = 512
+    data: numpy.ndarray[Any, Any] = numpy.ones((frames - 12, 2))
+    outdata: numpy.ndarray[Any, Any] = numpy.zeros(
+        (frames, mixer.channel_limit), dtype="float32"
+    )
+    mixer.add_input(lambda _: data, channel_map=[1, 2])
+    mixer.add_input(lambda _: data, channel_map=[2, 3])
+    mixer.add_input(lambda _: None, channel_map=[4])
+
+    assert_callback_does_not_allocate(
+        lambda: mixer._callback(outdata, frames, ..., sounddevice.CallbackFlags()), data
+    )
+
+
+def test_callback_stats_record():
+    stats = CallbackStats()
+    status = cast(Any, Mock(output_underflow=True, priming_output=False))
+    stats.record(status, frames=480, sample_rate=48000, elapsed=0.005)
+
+    assert stats.duration.count == 1
+    assert stats.load.max == pytest.approx(0.5)
+    assert stats.output_underflows == 1
+    assert stats.priming_outputs == 0
+
+    stats.reset()
+    assert stats.duration.count == 0
+    assert stats.output_underflows == 0
+
+
+def test_mixer_callback_records_stats(mixer: SounddeviceMixer):
+    call_mixer_callback(mixer, frames=16)
+    call_mixer_callback(mixer, frames=16)
+    assert mixer.stats.duration.count == 2
+    assert mixer.stats.load.count == 2
+
+
+def test_mixer_callback_prepares_thread_once(mixer: SounddeviceMixer):
+    mixer.prepare_thread = Mock()
+    call_mixer_callback(mixer, frames=16)
+    call_mixer_callback(mixer, frames=16)
+    mixer.prepare_thread.assert_called_once_with()
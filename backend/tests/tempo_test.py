@@ -1,6 +1,7 @@
 from typing import Any
 
 import pytest
+from pydantic import ValidationError
 
 from tests.conftest import get_tempo
 
@@ -10,7 +11,20 @@ def test_lag(bpm: float, expected: float):
     assert round(get_tempo(bpm=bpm).lag, 3) == expected
 
 
-@pytest.mark.parametrize(("sig", "expected"), (("4/4", 4), ("6/8", 6)))
+@pytest.mark.parametrize("bpm", (0, -1))
+def test_bpm_must_be_positive(bpm: float):
+    with pytest.raises(ValidationError):
+        get_tempo(bpm=bpm)
+
+
+def test_cached_fields_are_not_serialized():
+    tempo = get_tempo()
+    assert tempo.dict() == {"bpm": 120, "time_signature": "4/4", "duration": "1/8"}
+    assert tempo == get_tempo()
+    assert hash(tempo) == hash(get_tempo())
+
+
+@pytest.mark.parametrize(("sig", "expected"), (("4/4", 4), ("6/8", 6), ("12/4", 12)))
 def test_beats_per_bar(sig: Any, expected: int):
     assert get_tempo(sig=sig).beats_per_bar == expected
 
@@ -23,6 +37,8 @@ def test_beats_per_bar(sig: Any, expected: int):
         ("4/4", 125, 112),
         ("6/8", 23, 0),
         ("6/8", 24, 24),
+        ("12/4", 47, 0),
+        ("12/4", 50, 48),
     ),
 )
 def test_get_start_of_bar(sig: Any, position: int, expected: int):
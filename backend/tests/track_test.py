@@ -5,7 +5,17 @@ from unittest.mock import Mock, PropertyMock
 import numpy
 import pytest
 
-from playbacker.core.track import Shared, SoundTrack, StreamBuilder, trim_audio_array
+from playbacker.core.tempo import Tempo
+from playbacker.core.track import (
+    RenderedSound,
+    Shared,
+    SoundEvent,
+    SoundTrack,
+    StreamBuilder,
+    render_sound_events,
+    trim_audio_array,
+)
+from tests.conftest import get_tempo
 
 
 @pytest.mark.parametrize(("data_length", "expected_length"), ((512, 256), (220, 200)))
@@ -23,11 +33,71 @@ def test_trim_audio_array(data_length: int, expected_length: int):
         assert all(val == 0 for val in chunk)
 
 
+def ones(length: int, value: float = 1, channels: int = 1):
+    data: numpy.ndarray[Any, Any] = numpy.ones((length, channels))
+    return data * value
+
+
+def test_render_sound_events_loop():
+    events = [
+        SoundEvent(offset=0, data=ones(2)),
+        SoundEvent(offset=1, data=ones(2, value=2, channels=2)),
+        SoundEvent(offset=6, data=ones(4, value=3), limit=3),
+    ]
+    result = render_sound_events(events, length=8, loop=True)
+
+    assert result.shape == (8, 2)
+    assert list(result[:, 0]) == [4, 3, 2, 0, 0, 0, 3, 3]
+    assert list(result[:, 1]) == [0, 2, 2, 0, 0, 0, 0, 0]
+
+
+def test_render_sound_events_no_loop():
+    events = [SoundEvent(offset=6, data=ones(4))]
+    result = render_sound_events(events, length=8, loop=False)
+    assert list(result[:, 0]) == [0, 0, 0, 0, 0, 0, 1, 1]
+
+
+def test_render_sound_events_empty():
+    assert render_sound_events([], length=4, loop=True).shape == (4, 1)
+
+
+def get_rendered_sound(loop: bool) -> RenderedSound:
+    data: numpy.ndarray[Any, Any] = numpy.array([[0.0], [1], [2], [3], [4], [5]])
+    # 1 frame per tick
+    return RenderedSound(data=data, tempo=get_tempo(bpm=15), sample_rate=1, loop=loop)
+
+
+def test_rendered_sound_loop():
+    sound = get_rendered_sound(loop=True)
+    sound.seek(4)
+
+    result = sound.read(10)
+    assert result is not None
+    assert list(result[:, 0]) == [4, 5, 0, 1, 2, 3, 4, 5, 0, 1]
+    assert sound.cursor == 2
+
+    sound.seek(7)
+    assert sound.cursor == 1
+
+
+def test_rendered_sound_no_loop():
+    sound = get_rendered_sound(loop=False)
+    sound.seek(4)
+
+    result = sound.read(10)
+    assert result is not None
+    assert list(result[:, 0]) == [4, 5]
+    assert sound.read(10) is None
+
+
 @dataclass
 class SomeTrack(SoundTrack[Any]):
     def get_sound(self):
         pass
 
+    def render(self, tempo: Tempo) -> RenderedSound:
+        return RenderedSound(data=ones(4), tempo=tempo, sample_rate=1, loop=True)
+
 
 @pytest.fixture
 def sound_track(stream_builder: StreamBuilder):
@@ -118,3 +188,65 @@ def test_start(sound_track: SoundTrack[Any], with_sounds: bool):
 
     if data_prop_mock:
         data_prop_mock.assert_called()
+
+
+@pytest.fixture
+def prerendered_track(sound_track: SoundTrack[Any]):
+    sound_track.prerender = True
+    sound_track.shared.configuring = False
+    sound_track.shared.tempo = get_tempo()
+    sound_track._render(sound_track.shared.tempo)
+    return sound_track
+
+
+def test_prerendered_callback(prerendered_track: SoundTrack[Any]):
+    result = prerendered_track.callback(3)
+    assert result is not None
+    assert len(result) == 3
+
+
+@pytest.mark.parametrize("paused", (True, False))
+@pytest.mark.parametrize("configuring", (True, False))
+def test_prerendered_callback_silent(
+    prerendered_track: SoundTrack[Any], paused: bool, configuring: bool
+):
+    prerendered_track.paused = paused
+    prerendered_track.shared.configuring = configuring
+    result = prerendered_track.callback(3)
+    assert (result is None) == (paused or configuring)
+
+
+def test_prerendered_callback_disabled_keeps_cursor(
+    prerendered_track: SoundTrack[Any],
+):
+    prerendered_track.enabled = False
+    assert prerendered_track.callback(3) is None
+    assert prerendered_track.rendered
+    assert prerendered_track.rendered.cursor == 3
+
+
+def test_prerendered_callback_not_rendered(sound_track: SoundTrack[Any]):
+    sound_track.prerender = True
+    sound_track.shared.configuring = False
+    assert sound_track.callback(3) is None
+
+
+def test_resume_seeks_rendered(prerendered_track: SoundTrack[Any]):
+    assert prerendered_track.rendered
+    prerendered_track.rendered.cursor = 3
+    prerendered_track.shared.position = 0
+    prerendered_track.resume()
+    assert prerendered_track.rendered.cursor == 0
+
+
+def test_start_renders(prerendered_track: SoundTrack[Any]):
+    prerendered_track.shared.tempo = get_tempo(bpm=60)
+    prerendered_track.start()
+    assert prerendered_track.rendered
+    assert prerendered_track.rendered.tempo == prerendered_track.shared.tempo
+
+
+def test_start_drops_rendered(prerendered_track: SoundTrack[Any]):
+    prerendered_track.prerender = False
+    prerendered_track.start()
+    assert prerendered_track.rendered is None
@@ -0,0 +1,173 @@
+import time
+from pathlib import Path
+
+import numpy
+import pytest
+import soundfile
+
+import playbacker.core.tracks.backing
+from playbacker.core.audiofile import AudioArray
+from playbacker.core.track import Shared, StreamBuilder
+from playbacker.core.tracks.backing import BackingTrack, StreamedFile
+from tests.conftest import get_tempo
+
+
+def get_data(frames: int, channels: int = 2) -> AudioArray:
+    return numpy.repeat(numpy.linspace(-1, 1, frames)[:, None], channels, axis=1)
+
+
+@pytest.fixture
+def path(tmp_path: Path) -> Path:
+    path = tmp_path / "stem.wav"
+    soundfile.write(  # pyright: ignore[reportUnknownMemberType]
+        path, get_data(2000), 1000, subtype="DOUBLE"
+    )
+    return path
+
+
+def read_all(file: StreamedFile, frames: int = 64) -> AudioArray:
+    chunks: list[AudioArray] = []
+
+    while True:
+        # Don't read faster than file is prefetched
+        while file.buffer.available < frames and not file.buffer.closed:
+            time.sleep(0.001)
+        if (data := file.read(frames)) is None:
+            break
+        chunks.append(data.copy())
+
+    assert file.buffer.underruns == 0
+    return numpy.concatenate(chunks)
+
+
+def test_streamed_file_reads_whole_file(path: Path):
+    file = StreamedFile(path, sample_rate=1000, buffer_seconds=0.1)
+    file.primed.wait()
+
+    assert (read_all(file) == get_data(2000)).all()
+    assert file.buffer.closed
+
+
+def test_streamed_file_starts_from_frame(path: Path):
+    file = StreamedFile(path, sample_rate=1000, start_frame=1500)
+    file.primed.wait()
+    assert (read_all(file) == get_data(2000)[1500:]).all()
+
+
+def test_streamed_file_resamples(path: Path):
+    file = StreamedFile(path, sample_rate=2000, buffer_seconds=0.1)
+    file.primed.wait()
+    data = read_all(file)
+
+    assert len(data) == pytest.approx(4000, abs=100)
+    assert data.shape[1] == 2
+
+
+def test_streamed_file_underrun(path: Path):
+    file = StreamedFile(path, sample_rate=1000, buffer_seconds=1)
+    file.stop()
+    file.primed.wait()
+    file.buffer.closed = False
+    file.buffer.consumed = file.buffer.written
+
+    data = file.read(10)
+    assert data is not None
+    assert not data.any()
+    assert file.buffer.underruns == 1
+
+
+def test_streamed_file_missing(tmp_path: Path):
+    with pytest.raises(RuntimeError):
+        StreamedFile(tmp_path / "nope.wav", sample_rate=1000)
+
+
+@pytest.fixture
+def track(stream_builder: StreamBuilder) -> BackingTrack:
+    track = BackingTrack(shared=Shared(), stream_builder=stream_builder)
+    track.stream.sample_rate = 1000
+    track.shared.tempo = get_tempo(bpm=60, duration="1/4")
+    track.shared.configuring = False
+    return track
+
+
+def test_callback_no_file(stream_builder: StreamBuilder):
+    track = BackingTrack(shared=Shared(), stream_builder=stream_builder)
+    track.shared.configuring = False
+    track.start(None)
+    assert track.callback(10) is None
+
+
+def test_start_missing_file(track: BackingTrack, tmp_path: Path):
+    track.start(tmp_path / "nope.wav")
+    assert track.file is None
+    assert not track.paused
+    assert track.callback(10) is None
+
+
+def test_start_file_not_primed(
+    track: BackingTrack, path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(playbacker.core.tracks.backing, "_PRIME_TIMEOUT", 0.01)
+    monkeypatch.setattr(StreamedFile, "_prefetch", lambda self: None)  # pyright: ignore
+    track.start(path)
+    assert track.file is None
+    assert not track.paused
+
+
+def test_callback(track: BackingTrack, path: Path):
+    track.start(path)
+    data = track.callback(10)
+    assert data is not None
+    assert (data == get_data(2000)[:10]).all()
+
+
+@pytest.mark.parametrize(("paused", "configuring"), ((True, False), (False, True)))
+def test_callback_silent(
+    track: BackingTrack, path: Path, paused: bool, configuring: bool
+):
+    track.start(path)
+    track.paused = paused
+    track.shared.configuring = configuring
+
+    assert track.callback(10) is None
+    assert track.file
+    assert track.file.buffer.consumed == 0
+
+
+def test_callback_disabled_keeps_reading(track: BackingTrack, path: Path):
+    track.start(path)
+    track.enabled = False
+
+    assert track.callback(10) is None
+    assert track.file
+    assert track.file.buffer.consumed == 10
+
+
+def test_resume_seeks(track: BackingTrack, path: Path):
+    track.start(path)
+    previous = track.file
+    track.pause()
+    track.shared.position = 2
+    track.resume()
+
+    assert previous and previous.stopped
+    assert track.file
+    assert track.file.start_frame == round(2 * track.shared.tempo.lag * 1000)
+    assert not track.paused
+
+
+def test_count_underruns(track: BackingTrack, path: Path):
+    track.start(path)
+    assert track.file
+    track.file.buffer.underruns = 2
+    track.resume()
+    assert track.file
+    track.file.buffer.underruns = 1
+
+    assert track.count_underruns() == 3
+
+
+def test_destroy_stops_file(track: BackingTrack, path: Path):
+    track.start(path)
+    track.destroy()
+    assert track.file and track.file.stopped
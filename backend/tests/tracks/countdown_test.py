@@ -1,3 +1,4 @@
+import numpy
 import pytest
 
 from playbacker.core.tempo import TimeSignature
@@ -5,6 +6,7 @@ from playbacker.core.track import Shared, StreamBuilder
 from playbacker.core.tracks.countdown import (
     CountdownSounds,
     CountdownTrack,
+    compile_countdown_pattern,
     countdown_schemes,
 )
 from tests.conftest import TIME_SIGNATURES, get_audiofile_mock, get_tempo
@@ -55,3 +57,43 @@ def test_get_sound(
         assert track.current_frame == 0
     else:
         assert track.current_frame == 10
+
+
+@pytest.mark.parametrize("time_signature", TIME_SIGNATURES + ("12/4",))
+def test_compile_countdown_pattern(time_signature: TimeSignature):
+    pattern = compile_countdown_pattern(time_signature)
+    scheme = countdown_schemes[time_signature]
+
+    assert len(pattern) == scheme[-1].end + 1
+    assert [idx for idx, i in enumerate(pattern) if i is None] == [
+        e.end for e in scheme
+    ]
+    assert pattern[0] == scheme[0].instruction
+
+
+def test_render(stream_builder: StreamBuilder):
+    def sound(value: float):
+        mock, prop_mock = get_audiofile_mock()
+        prop_mock.return_value = numpy.full((100, 1), value)
+        return mock
+
+    track = CountdownTrack(
+        shared=Shared(),
+        stream_builder=stream_builder,
+        sounds=CountdownSounds(
+            count_1=sound(1), count_2=sound(2), count_3=sound(3), count_4=sound(4)
+        ),
+    )
+    track.stream.sample_rate = 16
+    tempo = get_tempo(bpm=60, sig="4/4")  # 4 frames per tick
+
+    rendered = track.render(tempo)
+    data = list(rendered.data[:, 0])
+
+    assert not rendered.loop
+    assert len(data) == 32 * 4
+    assert data[: 7 * 4] == [1] * 7 * 4
+    assert data[7 * 4 : 8 * 4] == [0] * 4
+    assert data[8 * 4 : 15 * 4] == [2] * 7 * 4
+    assert data[-4:] == [0] * 4
+    assert data[-8:-4] == [4] * 4
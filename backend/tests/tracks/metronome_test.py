@@ -1,6 +1,7 @@
 from pathlib import Path
 from unittest.mock import PropertyMock
 
+import numpy
 import pytest
 
 from playbacker.core.audiofile import AudioFile
@@ -9,7 +10,9 @@ from playbacker.core.track import Shared, StreamBuilder
 from playbacker.core.tracks.metronome import (
     MetronomeSounds,
     MetronomeTrack,
+    compile_metronome_pattern,
     get_instruction,
+    metronome_schemes,
 )
 from tests.conftest import DURATIONS, TIME_SIGNATURES, get_audiofile_mock
 
@@ -51,7 +54,7 @@ def test_get_sound(metronome_track: MetronomeTrack, position: int):
     )
     metronome_track.__post_init__()
 
-    metronome_track.shared.tempo = Tempo(bpm=0, time_signature="4/4", duration="1/8")
+    metronome_track.shared.tempo = Tempo(bpm=120, time_signature="4/4", duration="1/8")
     metronome_track.shared.position = position
 
     instr = get_instruction(metronome_track.shared.tempo, position)
@@ -67,5 +70,90 @@ def test_get_instruction(
 ):
     """Ensure any position will work with any tempo."""
     get_instruction(
-        Tempo(bpm=0, time_signature=time_signature, duration=duration), position
+        Tempo(bpm=120, time_signature=time_signature, duration=duration), position
+    )
+
+
+@pytest.mark.parametrize("time_signature", TIME_SIGNATURES + ("12/4",))
+@pytest.mark.parametrize("duration", DURATIONS)
+def test_compiled_pattern_matches_scheme(
+    time_signature: TimeSignature, duration: Duration
+):
+    tempo = Tempo(bpm=120, time_signature=time_signature, duration=duration)
+
+    for position in range(100):
+        expected = None
+        for divider, instruction in metronome_schemes[time_signature][duration]:
+            if position % divider == 0:
+                expected = instruction
+                break
+
+        assert get_instruction(tempo, position) == expected
+
+
+def test_compile_metronome_pattern():
+    assert compile_metronome_pattern("4/4", "1/8") == (4, None, 8, None)
+    assert compile_metronome_pattern("4/4", "1/8") is compile_metronome_pattern(
+        "4/4", "1/8"
+    )
+
+
+def sound(length: int, value: float):
+    mock, prop_mock = get_audiofile_mock()
+    prop_mock.return_value = numpy.full((length, 1), value)
+    return mock
+
+
+def test_render(metronome_track: MetronomeTrack):
+    metronome_track.sounds = MetronomeSounds(
+        accent=sound(1, 1),
+        tick_1_4=sound(2, 4),
+        tick_1_8=sound(10, 8),
+        tick_1_16=sound(1, 16),
+    )
+    metronome_track.__post_init__()
+    metronome_track.stream.sample_rate = 16
+    tempo = Tempo(bpm=60, time_signature="4/4", duration="1/8")  # 4 frames per tick
+
+    rendered = metronome_track.render(tempo)
+    data = rendered.data[:, 0]
+
+    assert rendered.loop
+    assert len(data) == 16 * 4
+    assert list(data[:10]) == [4 + 8, 4 + 8, 0, 0, 0, 0, 0, 0, 8, 8]
+    # Tail of the last 1/8 in bar wraps to the beginning
+    assert list(data[56:]) == [8] * 8
+
+
+def test_prerendered_tempo_change(metronome_track: MetronomeTrack):
+    metronome_track.sounds = MetronomeSounds(
+        accent=sound(1, 1),
+        tick_1_4=sound(1, 4),
+        tick_1_8=sound(1, 8),
+        tick_1_16=sound(1, 16),
+    )
+    metronome_track.__post_init__()
+    metronome_track.prerender = True
+    metronome_track.stream.sample_rate = 16
+    shared = metronome_track.shared
+
+    def start(tempo: Tempo) -> list[int]:
+        # Same as Playback.starting_ctx
+        shared.configuring = True
+        shared.position = 0
+        shared.tempo = tempo
+        metronome_track.start()
+        shared.configuring = False
+
+        data = metronome_track.callback(32)
+        assert data is not None
+        return list(numpy.flatnonzero(data[:, 0]))
+
+    # 4 frames per tick, 1/8 on every other tick
+    assert start(Tempo(bpm=60, time_signature="4/4", duration="1/8")) == list(
+        range(0, 32, 8)
+    )
+    # Changed in the middle of the bar, clicks start over with new lag
+    assert start(Tempo(bpm=120, time_signature="4/4", duration="1/8")) == list(
+        range(0, 32, 4)
     )
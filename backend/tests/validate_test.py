@@ -0,0 +1,142 @@
+import os
+import re
+from pathlib import Path
+
+import pytest
+
+import playbacker.core.validate
+from playbacker.core.validate import (
+    PARALLEL_MIN_FILES,
+    ValidationCache,
+    format_config_files,
+    get_unknown_songs,
+    get_validation_cache_path,
+    parse_setlists,
+)
+
+SONGS = """\
+A:
+  tempo:
+    bpm: 120
+    time_signature: 4/4
+    duration: 1/4
+"""
+
+
+@pytest.fixture
+def config_dir(tmp_path: Path) -> Path:
+    (tmp_path / "config.yaml").write_text("devices: []\n")
+    (tmp_path / "songs.yaml").write_text(SONGS)
+    (tmp_path / "setlists").mkdir()
+    (tmp_path / "setlists" / "a.yaml").write_text("- a\n- B\n")
+    (tmp_path / "setlists" / "b.yaml").write_text("- A\n")
+    return tmp_path
+
+
+@pytest.fixture
+def cache(tmp_path: Path) -> ValidationCache:
+    return ValidationCache(tmp_path / "cache" / "validation.json")
+
+
+@pytest.fixture
+def parsed(monkeypatch: pytest.MonkeyPatch) -> list[bytes]:
+    parsed: list[bytes] = []
+    parse = playbacker.core.validate._parse_setlist  # pyright: ignore
+
+    def parse_and_record(path: Path, data: bytes) -> list[str]:
+        parsed.append(data)
+        return parse(path, data)
+
+    monkeypatch.setattr(playbacker.core.validate, "_parse_setlist", parse_and_record)
+    return parsed
+
+
+def test_get_unknown_songs(config_dir: Path, cache: ValidationCache):
+    result = get_unknown_songs(
+        config_dir / "songs.yaml", config_dir / "setlists", cache
+    )
+    assert result == {config_dir / "setlists" / "a.yaml": ["B"]}
+
+
+def test_parse_setlists_skips_known_contents(
+    config_dir: Path, cache: ValidationCache, parsed: list[bytes]
+):
+    paths = sorted((config_dir / "setlists").glob("*.yaml"))
+    assert parse_setlists(paths, cache) == {paths[0]: ["a", "B"], paths[1]: ["A"]}
+    assert len(parsed) == 2
+
+    paths[1].write_text("- a\n- B\n")
+    assert parse_setlists(paths, cache)[paths[1]] == ["a", "B"]
+    assert len(parsed) == 2
+
+    paths[1].write_text("- C\n")
+    assert parse_setlists(paths, cache)[paths[1]] == ["C"]
+    assert parsed[2:] == [b"- C\n"]
+
+
+def test_parse_setlists_in_parallel(tmp_path: Path, cache: ValidationCache):
+    paths = [tmp_path / f"{idx}.yaml" for idx in range(PARALLEL_MIN_FILES)]
+    for idx, path in enumerate(paths):
+        path.write_text(f"- song {idx}\n")
+
+    result = parse_setlists(paths, cache)
+    assert result == {path: [f"song {idx}"] for idx, path in enumerate(paths)}
+
+
+@pytest.mark.parametrize("content", ("- [a", "a: b"))
+@pytest.mark.parametrize("parallel", (False, True))
+def test_parse_setlists_errors_name_file(
+    tmp_path: Path, cache: ValidationCache, content: str, parallel: bool
+):
+    count = PARALLEL_MIN_FILES if parallel else 1
+    paths = [tmp_path / f"{idx}.yaml" for idx in range(count)]
+    for idx, path in enumerate(paths):
+        path.write_text(f"- song {idx}\n")
+    paths[-1].write_text(content)
+
+    with pytest.raises(Exception, match=re.escape(str(paths[-1]))):
+        parse_setlists(paths, cache)
+
+
+def test_cache_is_saved(config_dir: Path, cache: ValidationCache):
+    setlists_dir = config_dir / "setlists"
+    get_unknown_songs(config_dir / "songs.yaml", setlists_dir, cache)
+    format_config_files(
+        config_dir / "config.yaml", config_dir / "songs.yaml", setlists_dir, cache
+    )
+    cache.setlists["unused"] = []
+    cache.save()
+
+    loaded = ValidationCache.load(cache.path)
+    assert loaded.setlists == {k: v for k, v in cache.setlists.items() if k != "unused"}
+    assert loaded.formatted == cache.formatted
+    assert not loaded.seen
+
+
+def test_cache_load_ignores_broken_file(tmp_path: Path):
+    path = tmp_path / "validation.json"
+    path.write_text("{")
+    assert ValidationCache.load(path) == ValidationCache(path)
+    path.write_text('{"version": 0, "setlists": {"a": []}, "formatted": []}')
+    assert ValidationCache.load(path) == ValidationCache(path)
+
+
+def test_format_config_files_skips_formatted(config_dir: Path, cache: ValidationCache):
+    files = (config_dir / "config.yaml", config_dir / "songs.yaml")
+    setlists_dir = config_dir / "setlists"
+    (setlists_dir / "b.yaml").write_text("[A]")
+
+    assert format_config_files(*files, setlists_dir, cache) == [setlists_dir / "b.yaml"]
+    assert (setlists_dir / "b.yaml").read_text() == "- A\n"
+
+    os.utime(setlists_dir / "a.yaml", ns=(0, 0))
+    assert format_config_files(*files, setlists_dir, cache) == []
+    assert (setlists_dir / "a.yaml").stat().st_mtime_ns == 0
+
+
+def test_get_validation_cache_path(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    path = get_validation_cache_path(Path("config"))
+    assert path.parent == tmp_path / "playbacker" / "validation"
+    assert path == get_validation_cache_path(Path("config").resolve())
+    assert path != get_validation_cache_path(Path("other"))
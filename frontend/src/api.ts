@@ -15,6 +15,18 @@ export interface Setlist {
   songs: Song[];
 }
 
+export interface SetlistPatch {
+  removed: string[];
+  added: Song[];
+  changed: Song[];
+  order: string[] | null;
+}
+
+export type WatchMessage =
+  | { type: "snapshot"; version: number; setlist: Setlist | null }
+  | { type: "patch"; base: number; version: number; patch: SetlistPatch }
+  | { type: "setlists" };
+
 export interface PlayerState {
   playing: boolean;
   guide_enabled: boolean;
@@ -23,7 +35,7 @@ export interface PlayerState {
 export interface Player {
   get_setlists(): Promise<string[]>;
   get_setlist(name: string): Promise<Setlist>;
-  toggle_playing(tempo: Tempo): Promise<PlayerState>;
+  toggle_playing(tempo: Tempo, song?: string): Promise<PlayerState>;
   toggle_guide_enabled(): Promise<PlayerState>;
   prepare_for_switch(): Promise<PlayerState>;
   reset(): Promise<PlayerState>;
@@ -34,13 +46,15 @@ export const makeUrl = (path: string) => `http://127.0.0.1:8000${path}`;
 export function apiPlayer(): Player {
   const e = async (path: string, init?: RequestInit) =>
     (await fetch(makeUrl(path), { method: "POST", ...init })).json();
+  // GET responses are revalidated by browser cache with ETag
+  const read = async (path: string) => (await fetch(makeUrl(path))).json();
 
   return {
-    get_setlists: () => e("/get_setlists"),
+    get_setlists: () => read("/get_setlists"),
     get_setlist: (name: string) =>
-      e(`/get_setlist?${new URLSearchParams({ name })}`),
-    toggle_playing: (tempo: Tempo) =>
-      e("/toggle_playing", {
+      read(`/get_setlist?${new URLSearchParams({ name })}`),
+    toggle_playing: (tempo: Tempo, song?: string) =>
+      e(`/toggle_playing?${new URLSearchParams(song ? { song } : {})}`, {
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify(tempo),
       }),
@@ -6,7 +6,14 @@ import {
   createSignal,
   on,
 } from "solid-js";
-import { Player, PlayerState, Song } from "./api";
+import {
+  Player,
+  PlayerState,
+  Setlist,
+  SetlistPatch,
+  Song,
+  WatchMessage,
+} from "./api";
 
 function getPreviousSong(
   songs: Song[],
@@ -17,6 +24,15 @@ function getPreviousSong(
   return songs.at(index - 1);
 }
 
+function applySetlistPatch(setlist: Setlist, patch: SetlistPatch): Setlist {
+  const songs = new Map(setlist.songs.map((song) => [song.name, song]));
+  for (const name of patch.removed) songs.delete(name);
+  for (const song of [...patch.added, ...patch.changed])
+    songs.set(song.name, song);
+  const order = patch.order ?? setlist.songs.map((song) => song.name);
+  return { ...setlist, songs: order.map((name) => songs.get(name)!) };
+}
+
 function getNextSong(songs: Song[], current: Song | null): Song {
   if (!current) return songs[0];
   const index = songs.indexOf(current);
@@ -39,10 +55,8 @@ export function getStore(player: Player) {
     { equals: (prev, next) => !allowSetlistChange(prev, next) },
   );
 
-  const [setlist, { refetch: refetchSetlist }] = createResource(
-    setlistName,
-    player.get_setlist,
-  );
+  const [setlist, { refetch: refetchSetlist, mutate: mutateSetlist }] =
+    createResource(setlistName, player.get_setlist);
   createEffect(
     on(setlist, (setlist) => {
       const song_ = song();
@@ -88,7 +102,7 @@ export function getStore(player: Player) {
   async function togglePlaying() {
     const song_ = song();
     if (!song_) return;
-    updateState(await player.toggle_playing(song_.tempo));
+    updateState(await player.toggle_playing(song_.tempo, song_.name));
   }
 
   const [guideEnabled, _setGuideEnabled] = createSignal(true);
@@ -97,20 +111,50 @@ export function getStore(player: Player) {
   const resetPlayback = async () => updateState(await player.reset());
 
   let websocket: WebSocket | undefined;
-  createEffect(() => {
-    const setlistName_ = setlistName();
+  // Version of current setlist that patches apply to
+  let setlistVersion: number | undefined;
+  function handleWatchMessage(socket: WebSocket, message: WatchMessage) {
+    if (message.type == "setlists") refetchSetlists();
+    else if (message.type == "snapshot") {
+      setlistVersion = message.version;
+      // Fetch to show why setlist can't be loaded
+      if (message.setlist) mutateSetlist(message.setlist);
+      else refetchSetlist();
+    } else {
+      const setlist_ = setlist();
+      if (setlist_ && message.base === setlistVersion) {
+        setlistVersion = message.version;
+        mutateSetlist(applySetlistPatch(setlist_, message.patch));
+      } else socket.send("resync");
+    }
+  }
+  function watch(setlistName_: string | null) {
     websocket?.close();
-    websocket = new WebSocket(
-      `ws://127.0.0.1:8000/watch?current_setlist=${setlistName_}`,
-    );
-    websocket.addEventListener(
+    const params = new URLSearchParams({ current_setlist: `${setlistName_}` });
+    if (setlistVersion !== undefined)
+      params.set("version", `${setlistVersion}`);
+    const socket = new WebSocket(`ws://127.0.0.1:8000/watch?${params}`);
+    websocket = socket;
+    socket.addEventListener(
       "message",
-      (event) => {
-        if (event.data == "current_setlist") refetchSetlist();
-        else if (event.data == "setlists") refetchSetlists();
-      },
+      (event) => handleWatchMessage(socket, JSON.parse(event.data)),
       false,
     );
+    // Server drops clients that fall behind: catch up and reconnect.
+    // Setlist catches up with patches sent since last version
+    socket.addEventListener("close", () => {
+      if (websocket !== socket) return;
+      setTimeout(() => {
+        if (websocket !== socket) return;
+        refetchSetlists();
+        watch(setlistName_);
+      }, 1000);
+    });
+  }
+  createEffect(() => {
+    const setlistName_ = setlistName();
+    setlistVersion = undefined;
+    watch(setlistName_);
   });
   // let websocket: WebSocket | undefined;
   // createEffect(() => {